@@ -0,0 +1,49 @@
+"""
+    Benchmarks of admin filters and changelist
+"""
+import pytest
+from django.contrib import admin
+from django.test import Client, RequestFactory
+
+from conftest import TABLE_SIZES, populate_books
+
+
+def _get_filter(filter_class, field_name, admin_user, params=None):
+    from benchapp.models import Book
+    request = RequestFactory().get("/admin/benchapp/book/")
+    request.user = admin_user
+    model_admin = admin.site._registry[Book]
+    field = Book._meta.get_field(field_name)
+    return filter_class(field, request, dict(params or {}), Book, model_admin, field_name), request, model_admin
+
+
+@pytest.mark.benchmark(group="count related filter")
+@pytest.mark.parametrize("size", TABLE_SIZES)
+def bench_count_related_field_choices(benchmark, size, admin_user):
+    from django_autoutils.admin_utils import CountRelatedFieldListFilter
+    populate_books(size)
+    list_filter, request, model_admin = _get_filter(CountRelatedFieldListFilter, "author", admin_user)
+    benchmark(list_filter.field_choices, list_filter.field, request, model_admin)
+
+
+@pytest.mark.benchmark(group="slider numeric filter")
+@pytest.mark.parametrize("size", TABLE_SIZES)
+def bench_slider_numeric_choices(benchmark, size, admin_user):
+    from django_autoutils.admin_numeric_filter.admin import SliderNumericFilter
+    populate_books(size)
+    list_filter, request, model_admin = _get_filter(SliderNumericFilter, "pages", admin_user)
+    benchmark(list_filter.choices, None)
+
+
+@pytest.mark.benchmark(group="changelist")
+@pytest.mark.parametrize("size", TABLE_SIZES)
+def bench_changelist(benchmark, size, admin_user):
+    populate_books(size)
+    client = Client()
+    client.force_login(admin_user)
+
+    def render():
+        response = client.get("/admin/benchapp/book/")
+        assert response.status_code == 200
+
+    benchmark(render)
@@ -0,0 +1,91 @@
+"""
+    Archive and restore of rows with related rows, archive table is changed between them like after a migration
+"""
+import datetime
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, models
+from django.utils import timezone
+
+from django_autoutils.archive_utils import SKIP, archive_rows, create_archive_table, get_archive_model, restore_rows
+
+
+@pytest.fixture
+def shelves():
+    from benchapp.models import Shelf, ShelfItem, ShelfLabel
+    for model in (ShelfLabel, ShelfItem, Shelf):
+        model.objects.all().delete()
+        if _has_archive_table(model):
+            get_archive_model(model)._base_manager.all().delete()
+    with_items = Shelf.objects.create(name="with items", rank=3)
+    ShelfItem.objects.bulk_create(ShelfItem(shelf=with_items, title=f"item {index}") for index in range(3))
+    empty = Shelf.objects.create(name="empty", rank=5)
+    with_label = Shelf.objects.create(name="with label")
+    ShelfItem.objects.create(shelf=with_label, title="labeled item")
+    ShelfLabel.objects.create(shelf=with_label)
+    return with_items, empty, with_label
+
+
+def _has_archive_table(model):
+    return get_archive_model(model)._meta.db_table in connection.introspection.table_names()
+
+
+def _archive(model, **kwargs):
+    return sum(archive_rows(model, timezone.now() + datetime.timedelta(minutes=1), batch_size=2, **kwargs))
+
+
+def _get_extra_column(archive_model):
+    field = models.CharField(max_length=10, default="")
+    field.set_attributes_from_name("old_name")
+    field.model = archive_model
+    return field
+
+
+def bench_archive_and_restore(shelves):
+    from benchapp.models import Shelf, ShelfItem, ShelfLabel
+    with_items, empty, with_label = shelves
+    archive_shelf = get_archive_model(Shelf)
+    archive_item = get_archive_model(ShelfItem)
+
+    # Shelves with items are skipped with rule, label is protected so its shelf is always skipped
+    assert _archive(Shelf, rules={ShelfItem._meta.label: SKIP}) == 1
+    assert set(Shelf.objects.values_list("pk", flat=True)) == {with_items.pk, with_label.pk}
+    assert list(archive_shelf._base_manager.values_list("pk", "rank")) == [(empty.pk, 5)]
+
+    # Column of a new field is added with default of field, like archive table was created before the field
+    with connection.schema_editor() as schema_editor:
+        schema_editor.remove_field(archive_shelf, archive_shelf._meta.get_field("rank"))
+    create_archive_table(Shelf)
+    assert list(archive_shelf._base_manager.values_list("pk", "rank")) == [(empty.pk, 0)]
+
+    # Not null column that is not in model stops archive before any row is moved
+    with connection.schema_editor() as schema_editor:
+        schema_editor.add_field(archive_shelf, _get_extra_column(archive_shelf))
+    with pytest.raises(ImproperlyConfigured, match="old_name"):
+        _archive(Shelf)
+    with pytest.raises(ImproperlyConfigured, match="old_name"):
+        restore_rows(Shelf, [empty.pk])
+    assert Shelf.objects.count() == 2
+    with connection.schema_editor() as schema_editor:
+        schema_editor.remove_field(archive_shelf, _get_extra_column(archive_shelf))
+
+    # Items of cascade foreign key are archived with their shelf
+    assert _archive(Shelf) == 1
+    assert list(Shelf.objects.values_list("pk", flat=True)) == [with_label.pk]
+    assert archive_item._base_manager.filter(shelf_id=with_items.pk).count() == 3
+    assert ShelfItem.objects.filter(shelf=with_label).count() == 1
+    assert ShelfLabel.objects.count() == 1
+
+    # Empty value of a not null field stops restore, like a new field without default
+    archive_shelf._base_manager.filter(pk=empty.pk).update(rank=None)
+    with pytest.raises(ImproperlyConfigured, match="rank"):
+        restore_rows(Shelf, [with_items.pk, empty.pk])
+    assert Shelf.objects.count() == 1
+    archive_shelf._base_manager.filter(pk=empty.pk).update(rank=0)
+
+    assert restore_rows(Shelf, [with_items.pk, empty.pk]) == 2
+    assert dict(Shelf.objects.values_list("name", "rank")) == {"with items": 3, "empty": 0, "with label": 0}
+    assert ShelfItem.objects.filter(shelf=with_items).count() == 3
+    assert not archive_shelf._base_manager.exists()
+    assert not archive_item._base_manager.exists()
@@ -0,0 +1,48 @@
+"""
+    Import time budget of modules, measured with -X importtime
+    Use BENCH_IMPORT_BUDGET_US for change budget of self time of django_autoutils modules
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import BENCHMARKS_DIR
+
+IMPORT_BUDGET_US = int(os.environ.get("BENCH_IMPORT_BUDGET_US", "30000"))
+
+# These modules must be imported on first use
+HEAVY_MODULES = ("pygments", "admin_auto_filters", "django_admin_listfilter_dropdown", "rest_framework.serializers")
+
+
+def _get_import_times(module):
+    """
+        Get self and cumulative import time of each imported module in microseconds
+    """
+    code = ("import django; from django.conf import settings; "
+            "settings.configure(INSTALLED_APPS=['django.contrib.auth', 'django.contrib.contenttypes']); "
+            f"django.setup(); import {module}")
+    command = [sys.executable, "-X", "importtime", "-c", code]
+    env = {**os.environ, "PYTHONPATH": os.path.dirname(BENCHMARKS_DIR)}
+    # First run writes bytecode cache, so compile time is not measured
+    subprocess.run(command, env=env, capture_output=True, check=True)
+    result = subprocess.run(command, env=env, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        try:
+            self_time, cumulative_time, name = line.split(":", 1)[1].split("|")
+            times[name.strip()] = (int(self_time), int(cumulative_time))
+        except ValueError:
+            continue
+    return times
+
+
+@pytest.mark.parametrize("module", ["django_autoutils.model_utils", "django_autoutils.utils",
+                                    "django_autoutils.managers", "django_autoutils.admin_utils"])
+def bench_import_time(module):
+    times = _get_import_times(module)
+    heavy_modules = [name for name in times if name.startswith(HEAVY_MODULES)]
+    assert not heavy_modules, f"{module} imports {heavy_modules}"
+    self_time = sum(self_time for name, (self_time, _) in times.items() if name.startswith("django_autoutils"))
+    assert self_time < IMPORT_BUDGET_US, f"import of {module} takes {self_time}us in django_autoutils modules"
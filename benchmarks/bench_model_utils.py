@@ -0,0 +1,107 @@
+"""
+    Benchmarks of model utils
+"""
+import threading
+
+import pytest
+from django.db import connections
+
+from django_autoutils.model_utils import slug_generator, slug_batch_generator, time_random_generator, \
+    time_random_batch_generator
+from django_autoutils.utils import get_empty_request
+
+SLUG_COUNT = 10000
+
+
+@pytest.mark.benchmark(group="slug generator")
+def bench_slug_generator(benchmark):
+    benchmark(lambda: [slug_generator() for _ in range(SLUG_COUNT)])
+
+
+@pytest.mark.benchmark(group="slug generator")
+def bench_slug_batch_generator(benchmark):
+    benchmark(lambda: list(slug_batch_generator(SLUG_COUNT)))
+
+
+@pytest.mark.benchmark(group="time random generator")
+def bench_time_random_generator(benchmark):
+    benchmark(lambda: [time_random_generator() for _ in range(SLUG_COUNT)])
+
+
+@pytest.mark.benchmark(group="time random generator")
+def bench_time_random_batch_generator(benchmark):
+    benchmark(lambda: list(time_random_batch_generator(SLUG_COUNT)))
+
+
+@pytest.mark.benchmark(group="slug model insert")
+def bench_slug_model_save(benchmark):
+    from benchapp.models import Author, Book
+    author = Author.objects.create(name="save")
+
+    def save():
+        for index in range(100):
+            Book(title=f"save {index}", author=author).save()
+
+    benchmark(save)
+
+
+@pytest.mark.benchmark(group="slug model insert")
+def bench_slug_model_bulk_create(benchmark):
+    from benchapp.models import Author, Book
+    author = Author.objects.create(name="bulk")
+
+    def bulk_create():
+        books = [Book(title=f"bulk {index}", author=author) for index in range(100)]
+        Book.set_bulk_slug(books)
+        Book.objects.bulk_create(books)
+
+    benchmark(bulk_create)
+
+
+@pytest.mark.benchmark(group="model transaction")
+def bench_model_transaction(benchmark):
+    from benchapp.models import Account
+    account = Account.objects.create()
+    request = get_empty_request()
+    benchmark(account.deposit, request, 1)
+
+
+@pytest.mark.benchmark(group="model transaction contention")
+@pytest.mark.parametrize("threads", [2, 4])
+def bench_model_transaction_contention(benchmark, threads):
+    """
+        All threads update same object, sqlite serializes writes of threads
+    """
+    from benchapp.models import Account
+    account = Account.objects.create()
+
+    def worker():
+        request = get_empty_request()
+        for _ in range(10):
+            account.deposit(request, 1)
+        connections.close_all()
+
+    def run():
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+    benchmark(run)
+
+
+@pytest.mark.benchmark(group="view transaction")
+def bench_view_transaction(benchmark):
+    from benchapp.models import Account
+    from django_autoutils.model_utils import view_transaction
+    account = Account.objects.create()
+
+    class View:
+        @view_transaction(get_object=lambda view, request: account)
+        def post(self, request, obj):
+            return obj.update_data({"balance": 1})
+
+    view = View()
+    request = get_empty_request()
+    benchmark(view.post, request)
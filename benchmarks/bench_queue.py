@@ -0,0 +1,75 @@
+"""
+    Queue of model_transaction calls, locked objects are simulated with is_in_updating
+"""
+import datetime
+from unittest import mock
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+
+from django_autoutils.queue_utils import run_tasks
+from django_autoutils.utils import get_empty_request
+
+
+@pytest.fixture
+def accounts():
+    from benchapp.models import Account
+    from django_autoutils.models import TransactionTask
+    TransactionTask.objects.all().delete()
+    return Account.objects.create(), Account.objects.create()
+
+
+def _call_locked(method, *args):
+    from benchapp.models import Account
+    with mock.patch.object(Account, "is_in_updating", return_value=True):
+        method(get_empty_request(), *args)
+
+
+def bench_queue_collapses_calls(accounts):
+    from django_autoutils.models import TransactionTask
+    account, other = accounts
+    _call_locked(account.deposit_later, 10)
+    _call_locked(account.deposit_later, 20)
+    _call_locked(other.deposit_later, 1)
+    # Later call of same function and object replaces arguments of pending call
+    assert sorted(TransactionTask.objects.values_list("object_id", "args")) == [
+        (str(account.pk), [20]), (str(other.pk), [1])]
+    assert run_tasks() == 2
+    account.refresh_from_db()
+    other.refresh_from_db()
+    assert (account.balance, other.balance) == (20, 1)
+    assert not TransactionTask.objects.exists()
+
+
+@override_settings(AUTOUTILS_TASK_RETRY_DELAY=10, AUTOUTILS_TASK_MAX_ATTEMPTS=2)
+def bench_queue_failed_calls(accounts):
+    from benchapp.models import Account
+    from django_autoutils.models import TransactionTask
+    account, deleted = accounts
+    _call_locked(account.fail_later)
+    _call_locked(deleted.deposit_later, 5)
+    deleted.delete()
+    TransactionTask.objects.create(function="benchapp.models.Account.removed", model=Account._meta.label,
+                                   object_id=str(account.pk))
+    start_time = timezone.now()
+    assert run_tasks() == 3
+    # Task of deleted object is removed, failed and unknown calls are postponed with error
+    tasks = {task.function.rsplit(".", 1)[-1]: task for task in TransactionTask.objects.all()}
+    assert set(tasks) == {"fail_later", "removed"}
+    assert tasks["fail_later"].error == "failed call"
+    assert tasks["removed"].error == "function is not registered"
+    for task in tasks.values():
+        assert task.attempts == 1
+        assert task.run_after >= start_time + datetime.timedelta(seconds=10)
+    assert run_tasks() == 0
+
+    # Delay is doubled for each attempt and tasks are not run after max attempts
+    TransactionTask.objects.update(run_after=timezone.now())
+    retry_time = timezone.now()
+    assert run_tasks() == 2
+    for task in TransactionTask.objects.all():
+        assert task.attempts == 2
+        assert task.run_after >= retry_time + datetime.timedelta(seconds=20)
+    TransactionTask.objects.update(run_after=timezone.now())
+    assert run_tasks() == 0
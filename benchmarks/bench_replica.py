@@ -0,0 +1,78 @@
+"""
+    Read replica routing with two sqlite databases, replica is a separate database that is not synced with default
+"""
+import contextvars
+import time
+
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from django_autoutils.replica_utils import PIN_COOKIE_NAME, ReplicaPinMiddleware, get_read_database
+
+REPLICA_SETTINGS = {
+    "AUTOUTILS_REPLICA_DATABASE": "replica",
+    "AUTOUTILS_REPLICA_STALENESS": 5,
+    "DATABASE_ROUTERS": ["django_autoutils.replica_utils.ReplicaRouter"],
+}
+
+
+@pytest.fixture(scope="module")
+def replica():
+    from django.core.management import call_command
+    call_command("migrate", database="replica", run_syncdb=True, verbosity=0)
+    with override_settings(**REPLICA_SETTINGS):
+        yield
+
+
+def _run_in_new_context(func, *args):
+    # Each run starts without pin of primary, like a new request
+    return contextvars.Context().run(func, *args)
+
+
+def _get_request(cookies=None, data=None):
+    request = RequestFactory().get("/", data)
+    request.COOKIES.update(cookies or {})
+    return request
+
+
+def bench_replica_is_used_for_reads(replica):
+    from benchapp.models import Author
+    assert _run_in_new_context(get_read_database) == "replica"
+    assert get_read_database("other") == "other"
+
+    def write_and_read():
+        Author.objects.create(name="replica check")
+        return get_read_database(), Author.objects.using(get_read_database()).filter(name="replica check").exists()
+
+    # Rows of default are not in replica, so read of a pinned request must see its write
+    assert _run_in_new_context(write_and_read) == ("default", True)
+    assert not Author.objects.using(_run_in_new_context(get_read_database)).filter(name="replica check").exists()
+
+
+def bench_replica_pin_cookie(replica):
+    from benchapp.models import Author
+    databases = []
+
+    def get_response(request):
+        if request.GET.get("write"):
+            Author.objects.create(name="pin check")
+        databases.append(get_read_database())
+        return HttpResponse()
+
+    middleware = ReplicaPinMiddleware(get_response)
+    response = _run_in_new_context(middleware, _get_request())
+    assert PIN_COOKIE_NAME not in response.cookies
+    response = _run_in_new_context(middleware, _get_request(data={"write": "1"}))
+    cookie = response.cookies[PIN_COOKIE_NAME]
+    assert cookie["max-age"] == 5
+    # Next request of client is pinned while cookie is fresh
+    _run_in_new_context(middleware, _get_request({PIN_COOKIE_NAME: cookie.value}))
+    _run_in_new_context(middleware, _get_request({PIN_COOKIE_NAME: str(time.time() - 10)}))
+    _run_in_new_context(middleware, _get_request({PIN_COOKIE_NAME: "bad"}))
+    assert databases == ["replica", "default", "default", "replica", "replica"]
+
+
+@pytest.mark.benchmark(group="replica")
+def bench_get_read_database(benchmark, replica):
+    assert benchmark(_run_in_new_context, get_read_database) == "replica"
@@ -0,0 +1,52 @@
+"""
+    Benchmark of full text search index against icontains search
+    Use BENCH_SEARCH_ROWS=1000000 for million rows
+"""
+import os
+
+import pytest
+
+from conftest import populate_books
+
+SEARCH_ROWS = int(os.environ.get("BENCH_SEARCH_ROWS", "100000"))
+
+
+@pytest.fixture(scope="module")
+def search_index():
+    from benchapp.models import Book
+    from django_autoutils.search_utils import get_search_index
+    populate_books(SEARCH_ROWS)
+    index = get_search_index(Book, ["title"])
+    index.rebuild()
+    return index
+
+
+@pytest.mark.benchmark(group="search")
+def bench_search_icontains(benchmark, search_index):
+    from benchapp.models import Book
+    benchmark(lambda: list(Book.objects.filter(title__icontains="book 1234 ")[:100]))
+
+
+@pytest.mark.benchmark(group="search")
+def bench_search_index(benchmark, search_index):
+    from benchapp.models import Book
+    benchmark(lambda: list(search_index.filter(Book.objects.all(), "book 1234")[:100]))
+
+
+def bench_search_index_sync(search_index):
+    from benchapp.models import Author, Book
+    author = Author.objects.first()
+    books = [Book(title=f"synced{index}", author=author) for index in range(3)]
+    Book.set_bulk_slug(books)
+    Book.objects.bulk_create(books)
+
+    def search(term):
+        return sorted(search_index.filter(Book.objects.all(), term).values_list("title", flat=True))
+
+    assert search("synced0") == ["synced0"]
+    Book.objects.filter(title="synced1").update(title="renamed1")
+    assert search("synced1") == []
+    assert search("renamed1") == ["renamed1"]
+    Book.objects.filter(title__in=["synced0", "renamed1", "synced2"]).delete()
+    assert search("synced2") == []
+    assert search("renamed1") == []
@@ -0,0 +1,65 @@
+"""
+    Benchmarks of utils, html tags and serializers
+"""
+import pytest
+
+from django_autoutils.html_tag import get_pretty_json
+from django_autoutils.utils import get_request_obj, get_model_serializer
+
+
+def _call_in_depth(depth, func):
+    if depth == 0:
+        return func()
+    return _call_in_depth(depth - 1, func)
+
+
+@pytest.mark.benchmark(group="get request obj")
+@pytest.mark.parametrize("depth", [10, 50])
+def bench_get_request_obj(benchmark, depth):
+    def get_response(request):
+        return _call_in_depth(depth, get_request_obj)
+
+    assert get_response("request") == "request"
+    benchmark(get_response, "request")
+
+
+@pytest.mark.benchmark(group="pretty json")
+@pytest.mark.parametrize("size", [10, 1000, 100000])
+def bench_get_pretty_json(benchmark, size):
+    data = {f"key {index}": {"index": index, "values": list(range(10))} for index in range(size)}
+    benchmark(get_pretty_json, data)
+
+
+@pytest.mark.benchmark(group="model serializer factory")
+def bench_get_model_serializer(benchmark):
+    from benchapp.models import Book
+    benchmark(get_model_serializer, Book, ["id", "title", "pages", "price", "author", "slug", "insert_dt"])
+
+
+@pytest.mark.benchmark(group="model serializer list")
+@pytest.mark.parametrize("values_mode", [False, True])
+def bench_model_serializer_list(benchmark, values_mode):
+    from benchapp.models import Book
+    from conftest import populate_books
+    populate_books(10000)
+    serializer_class = get_model_serializer(Book, ["id", "title", "pages", "price", "author", "slug", "insert_dt"],
+                                            values_mode=values_mode)
+    benchmark(lambda: serializer_class(Book.objects.all(), many=True).data)
+
+
+@pytest.mark.benchmark(group="model serializer bulk create")
+@pytest.mark.parametrize("bulk_create", [False, True])
+def bench_model_serializer_create(benchmark, bulk_create):
+    from benchapp.models import Author, Book
+    author = Author.objects.create(name="serializer")
+    serializer_class = get_model_serializer(Book, ["id", "title", "pages", "price", "author"],
+                                            bulk_create=bulk_create)
+    payload = [{"title": f"payload {index}", "pages": index, "price": "1.00", "author": author.id}
+               for index in range(10000)]
+
+    def create():
+        serializer = serializer_class(data=payload, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+    benchmark.pedantic(create, rounds=3, iterations=1)
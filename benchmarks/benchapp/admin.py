@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from django_autoutils.admin_numeric_filter.admin import SliderNumericFilter
+from django_autoutils.admin_utils import EditLinkAdmin, AvatarAdmin, CountRelatedFieldListFilter
+from benchapp.models import Author, Book
+
+
+@admin.register(Author)
+class AuthorAdmin(admin.ModelAdmin):
+    search_fields = ["name"]
+
+
+@admin.register(Book)
+class BookAdmin(EditLinkAdmin, AvatarAdmin, admin.ModelAdmin):
+    list_display = ["title", "author", "pages", "edit_link", "avatar_icon"]
+    list_filter = [("author", CountRelatedFieldListFilter), ("pages", SliderNumericFilter)]
+    list_select_related = ["author"]
+    list_per_page = 100
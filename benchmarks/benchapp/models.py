@@ -0,0 +1,52 @@
+from django.db import models
+
+from django_autoutils.model_utils import AbstractModel, AbstractSlugModel, model_transaction, upload_file
+
+
+class Author(AbstractModel):
+    name = models.CharField(max_length=100)
+
+    def __str__(self):
+        return self.name
+
+
+class Book(AbstractSlugModel):
+    title = models.CharField(max_length=200)
+    pages = models.IntegerField(default=0)
+    price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    author = models.ForeignKey(Author, on_delete=models.CASCADE, related_name="books")
+    avatar = models.ImageField(upload_to=upload_file, blank=True)
+    data = models.JSONField(default=dict, blank=True)
+
+    def __str__(self):
+        return self.title
+
+
+class Account(AbstractModel):
+    balance = models.IntegerField(default=0)
+
+    @model_transaction()
+    def deposit(self, request, amount):
+        self.update_data({"balance": models.F("balance") + amount})
+
+    @model_transaction(enqueue=True)
+    def deposit_later(self, request, amount):
+        self.update_data({"balance": models.F("balance") + amount})
+
+    @model_transaction(enqueue=True)
+    def fail_later(self, request):
+        raise ValueError("failed call")
+
+
+class Shelf(AbstractModel):
+    name = models.CharField(max_length=100)
+    rank = models.IntegerField(default=0)
+
+
+class ShelfItem(models.Model):
+    shelf = models.ForeignKey(Shelf, on_delete=models.CASCADE, related_name="items")
+    title = models.CharField(max_length=100)
+
+
+class ShelfLabel(models.Model):
+    shelf = models.ForeignKey(Shelf, on_delete=models.PROTECT, related_name="labels")
@@ -0,0 +1,50 @@
+"""
+    Setup benchmark django project
+"""
+import os
+import sys
+
+import django
+import pytest
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARKS_DIR)
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings")
+django.setup()
+
+# Sizes of tables for benchmarks that depend on number of rows
+TABLE_SIZES = [int(size) for size in os.environ.get("BENCH_TABLE_SIZES", "100,10000,100000").split(",")]
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    from django.core.management import call_command
+    call_command("migrate", run_syncdb=True, verbosity=0)
+
+
+def populate_books(size, authors=50):
+    """
+        Fill book table with `size` rows
+    """
+    from benchapp.models import Author, Book
+    if Book.objects.count() == size:
+        return
+    Book.objects.all().delete()
+    Author.objects.all().delete()
+    author_objs = Author.objects.bulk_create(Author(name=f"author {index}") for index in range(authors))
+    books = [Book(title=f"book {index} about {index % 97} things", pages=index % 1000, price=index % 100,
+                  author=author_objs[index % authors], data={"index": index})
+             for index in range(size)]
+    Book.set_bulk_slug(books)
+    Book.objects.bulk_create(books, batch_size=5000)
+
+
+@pytest.fixture
+def admin_user():
+    from django.contrib.auth import get_user_model
+    user_model = get_user_model()
+    user = user_model.objects.filter(username="admin").first()
+    if user is None:
+        user = user_model.objects.create_superuser("admin", "admin@example.com", "admin")
+    return user
@@ -0,0 +1,57 @@
+"""
+    Minimal django project for benchmarks
+"""
+import os
+import tempfile
+
+import django
+
+SECRET_KEY = "benchmarks"
+DEBUG = False
+USE_TZ = True
+INSTALLED_APPS = [
+    "django.contrib.admin",
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "rest_framework",
+    "django_autoutils",
+    "django_autoutils.admin_numeric_filter",
+    "benchapp",
+]
+MIDDLEWARE = [
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+]
+ROOT_URLCONF = "urls"
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.environ.get("BENCH_DATABASE", os.path.join(tempfile.mkdtemp(), "benchmarks.sqlite3")),
+        "OPTIONS": {"timeout": 30},
+    },
+}
+# Replica of replica_utils benchmarks, it is used only where AUTOUTILS_REPLICA_DATABASE is set
+DATABASES["replica"] = {
+    "ENGINE": "django.db.backends.sqlite3",
+    "NAME": os.path.join(os.path.dirname(DATABASES["default"]["NAME"]), "replica.sqlite3"),
+    "OPTIONS": {"timeout": 30},
+}
+if django.VERSION >= (5, 1):
+    # Threads of contention benchmarks take write lock at start of transaction instead of deadlock in upgrade
+    DATABASES["default"]["OPTIONS"]["transaction_mode"] = "IMMEDIATE"
+TEMPLATES = [{
+    "BACKEND": "django.template.backends.django.DjangoTemplates",
+    "APP_DIRS": True,
+    "OPTIONS": {
+        "context_processors": [
+            "django.template.context_processors.request",
+            "django.contrib.auth.context_processors.auth",
+            "django.contrib.messages.context_processors.messages",
+        ],
+    },
+}]
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
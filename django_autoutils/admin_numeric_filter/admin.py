@@ -1,7 +1,9 @@
 from django.contrib import admin
-from django.db.models import Max, Min
+from django.db.models import Count, Max, Min
 from django.db.models.fields import DecimalField, FloatField, IntegerField, AutoField
 
+from django_autoutils.admin_utils import get_active_scope_queryset
+from django_autoutils.replica_utils import get_read_database
 from .forms import RangeNumericForm, SingleNumericForm, SliderNumericForm
 
 
@@ -101,7 +103,7 @@ class RangeNumericFilter(admin.FieldListFilter):
         return queryset.filter(**filters)
 
     def expected_parameters(self):
-        return [{self.parameter_name_from}, {self.parameter_name_to}]
+        return [self.parameter_name_from, self.parameter_name_to]
 
     def choices(self, changelist):
         return ({
@@ -133,18 +135,19 @@ class SliderNumericFilter(RangeNumericFilter):
         super().__init__(field, request, params, model, model_admin, field_path)
 
         self.field = field
-        self.q = model_admin.get_queryset(request)
+        self.q = get_active_scope_queryset(model_admin, request, model_admin.get_queryset(request))
 
     def choices(self, changelist):
-        total = self.q.all().count()
-        min_value = self.q.all().aggregate(
-            min=Min(self.parameter_name)
-        ).get("min", 0)
+        aggregates = self.q.using(get_read_database(self.q.db)).aggregate(
+            total=Count("pk"),
+            min=Min(self.parameter_name),
+            max=Max(self.parameter_name),
+        )
+        total = aggregates.get("total", 0)
+        min_value = aggregates.get("min", 0)
 
         if total > 1:
-            max_value = self.q.all().aggregate(
-                max=Max(self.parameter_name)
-            ).get("max", 0)
+            max_value = aggregates.get("max", 0)
         else:
             max_value = None
 
@@ -1,19 +1,61 @@
 """
     Admin utils
 """
+import contextlib
+import contextvars
+import csv
+import functools
+import hashlib
+import html
+import importlib
+import inspect
+import io
+import json
 import logging
+import re
+import time
 
-from admin_auto_filters.filters import AutocompleteFilterFactory
-from django.contrib.admin import FieldListFilter, RelatedFieldListFilter
-from django.db import models
+from django.apps import apps
+from django.contrib.admin import FieldListFilter, RelatedFieldListFilter, action, widgets
+from django.contrib.admin.options import IS_POPUP_VAR
+from django.contrib.admin.utils import (quote, unquote, get_fields_from_path, label_for_field, lookup_field,
+                                        NotRelationField)
+from django.core.cache import caches
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist, PermissionDenied
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, models
+from django.http import Http404, QueryDict, StreamingHttpResponse
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils import timezone
+from django.utils.functional import Promise
+from django.utils.html import strip_tags
+from django.utils.http import urlencode
+from django.utils.safestring import SafeData
 from django.utils.translation import gettext_lazy as _
-from django_admin_listfilter_dropdown.filters import RelatedDropdownFilter
 
-from django_autoutils.admin_numeric_filter.admin import SingleNumericFilter, RangeNumericFilter
 from django_autoutils.html_tag import get_edit_link, get_edit_icon, get_avatar_image, get_edit_url, get_pretty_json
+from django_autoutils.replica_utils import get_read_database
+from django_autoutils.search_utils import get_search_index
 
 logger = logging.getLogger("django_autoutils")
 
+# Filters of optional packages are imported on first use
+_LAZY_IMPORTS = {
+    "AutocompleteFilterFactory": "admin_auto_filters.filters",
+    "RelatedDropdownFilter": "django_admin_listfilter_dropdown.filters",
+    "SingleNumericFilter": "django_autoutils.admin_numeric_filter.admin",
+    "RangeNumericFilter": "django_autoutils.admin_numeric_filter.admin",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+    globals()[name] = value
+    return value
+
 
 class AutoCompleteFieldListFilter(FieldListFilter):
     """
@@ -22,15 +64,78 @@ class AutoCompleteFieldListFilter(FieldListFilter):
     pass
 
 
-def admin_display(function=None, *, label=None, description=None, ordering=None, allow_tags=None):
+_display_profile = contextvars.ContextVar("display_profile", default=None)
+
+
+class DisplayProfile:
+    """
+        Time and number of queries of admin display callables in one request
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.columns = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        """
+            Execute wrapper of connections for count queries
+        """
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    def record(self, name, duration, queries):
+        column = self.columns.setdefault(name, [0, 0.0, 0])
+        column[0] += 1
+        column[1] += duration
+        column[2] += queries
+
+    def get_summary(self) -> str:
+        return ", ".join(f"{name}: {calls} calls {duration * 1000:.1f}ms {queries} queries"
+                         for name, (calls, duration, queries) in self.columns.items())
+
+    def get_server_timing(self) -> str:
+        timings = []
+        for name, (calls, duration, queries) in self.columns.items():
+            timing_name = re.sub(r"\W", "_", name)
+            timings.append(f'{timing_name};dur={duration * 1000:.1f};desc="{calls} calls {queries} queries"')
+        return ", ".join(timings)
+
+
+def _get_profiled_display(func):
+    """
+        Record time and queries of function when profile of display is enabled in request
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        display_profile = _display_profile.get()
+        if display_profile is None:
+            return func(*args, **kwargs)
+        queries = display_profile.queries
+        start_time = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            display_profile.record(name, time.perf_counter() - start_time, display_profile.queries - queries)
+
+    return wrapper
+
+
+def admin_display(function=None, *, label=None, description=None, ordering=None, allow_tags=None, profile=False,
+                  batch=None):
     """
         Set Data for change action
+        With `profile` function is wrapped, so it is profiled in changelist of ProfileDisplayAdmin
+        `batch` is called with list of objects and returns list of values in export of ExportAdmin
     """
 
     def decorator(func):
         """
             Decorator
         """
+        if profile:
+            func = _get_profiled_display(func)
         if label is not None:
             func.label = label
         if description is not None:
@@ -39,6 +144,8 @@ def admin_display(function=None, *, label=None, description=None, ordering=None,
             func.admin_order_field = ordering
         if allow_tags is not None:
             func.allow_tags = allow_tags
+        if batch is not None:
+            func.batch = batch
         return func
 
     if function is None:
@@ -47,6 +154,16 @@ def admin_display(function=None, *, label=None, description=None, ordering=None,
         return decorator(function)
 
 
+def get_active_scope_queryset(model_admin, request, queryset):
+    """
+        Keep only active rows of queryset when changelist of model admin is in active scope
+    """
+    is_active_scoped = getattr(model_admin, "is_active_scoped", None)
+    if is_active_scoped is not None and is_active_scoped(request):
+        return queryset.filter(is_active=True)
+    return queryset
+
+
 class CountRelatedFieldListFilter(RelatedFieldListFilter):
     """
         Use this class for showing a beautiful dropdown in django list filter
@@ -69,7 +186,9 @@ class CountRelatedFieldListFilter(RelatedFieldListFilter):
             choices_dict[pk] = name
         pk_name = self.model._meta.pk.name
         count_field = pk_name + "__count"
-        query_set: "models.query.QuerySet" = self.model.objects.values(self.field_path).annotate(models.Count(pk_name))
+        query_set: "models.query.QuerySet" = get_active_scope_queryset(
+            model_admin, request, self.model._default_manager.using(get_read_database())).values(
+            self.field_path).annotate(models.Count(pk_name))
         query_set = query_set.order_by("-" + count_field)
         result = []
         for query in query_set:
@@ -97,7 +216,7 @@ class EditLinkAdmin:
     def _get_edit_text(self, obj):
         return self.edit_text
 
-    @admin_display(description=_("edit"), allow_tags=True)
+    @admin_display(description=_("edit"), allow_tags=True, profile=True)
     def edit_link(self, obj):
         """
             Edit link in admin panel
@@ -109,11 +228,59 @@ class EditLinkAdmin:
         return None
 
 
+# Objects of forms of LimitForeignKeyAdmin in current request, admin -> object
+_foreignkey_objs = contextvars.ContextVar("foreignkey_objs", default={})
+
+# Query parameter of autocomplete url that has id of object of form, it is empty in add form
+AUTOCOMPLETE_OBJECT_PARAM = "autoutils_object_id"
+
+
+class LimitAutocompleteSelect(widgets.AutocompleteSelect):
+    """
+        Autocomplete widget that sends id of object of form, so LimitAutocompleteAdmin limits results for it
+    """
+
+    def __init__(self, field, admin_site, attrs=None, choices=(), using=None, object_id=""):
+        super().__init__(field, admin_site, attrs=attrs, choices=choices, using=using)
+        self.object_id = object_id
+
+    def get_url(self):
+        return f"{super().get_url()}?{urlencode({AUTOCOMPLETE_OBJECT_PARAM: self.object_id})}"
+
+
 class LimitForeignKeyAdmin:
     """
         Use this class for common work in limit foreignkey queryset
+        `_get_foreignkey_queryset` is called with object of form in `self.obj`, it is kept for each request
+        Foreignkey fields with more related rows than `foreignkey_widget_threshold` use
+        `foreignkey_large_widget` ("autocomplete" or "raw_id") instead of select widget,
+        if it is None autocomplete is used when related admin has search fields
+        Autocomplete search is limited with LimitAutocompleteAdmin in admin of related model,
+        popup of raw id widget is not limited and selected id is only checked in validation of form
     """
-    obj = None
+    foreignkey_widget_threshold = 1000
+    foreignkey_large_widget = None
+    foreignkey_count_timeout = 300
+    foreignkey_count_cache = "default"
+
+    @property
+    def obj(self):
+        return _foreignkey_objs.get().get(self)
+
+    @obj.setter
+    def obj(self, obj):
+        _foreignkey_objs.set({**_foreignkey_objs.get(), self: obj})
+
+    @contextlib.contextmanager
+    def use_foreignkey_obj(self, obj):
+        """
+            Set object of form in a block, like in requests of autocomplete
+        """
+        token = _foreignkey_objs.set({**_foreignkey_objs.get(), self: obj})
+        try:
+            yield
+        finally:
+            _foreignkey_objs.reset(token)
 
     def get_form(self, request, obj=None, **kwargs):
         """
@@ -126,6 +293,41 @@ class LimitForeignKeyAdmin:
     def _get_foreignkey_queryset(self, request, db_field):
         return None
 
+    def _get_foreignkey_count(self, db_field, queryset):
+        """
+            Get count of related rows, counts are cached in `foreignkey_count_cache` for
+            `foreignkey_count_timeout` seconds
+        """
+        try:
+            sql = str(queryset.query)
+        except EmptyResultSet:
+            return 0
+        sql_hash = hashlib.sha1(f"{queryset.db}:{sql}".encode()).hexdigest()
+        # noinspection PyUnresolvedReferences
+        key = f"autoutils:foreignkey_count:{self.model._meta.label_lower}:{db_field.name}:{sql_hash}"
+        cache = caches[self.foreignkey_count_cache]
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, self.foreignkey_count_timeout)
+        return count
+
+    def _get_autocomplete_widget(self, db_field, using):
+        object_id = "" if self.obj is None else quote(self.obj.pk)
+        # noinspection PyUnresolvedReferences
+        return LimitAutocompleteSelect(db_field, self.admin_site, using=using, object_id=object_id)
+
+    def _get_large_foreignkey_widget(self, db_field, using):
+        widget = self.foreignkey_large_widget
+        # noinspection PyUnresolvedReferences
+        related_admin = self.admin_site._registry.get(db_field.remote_field.model)
+        if widget is None:
+            widget = "autocomplete" if related_admin is not None and related_admin.search_fields else "raw_id"
+        if widget == "autocomplete":
+            return self._get_autocomplete_widget(db_field, using)
+        # noinspection PyUnresolvedReferences
+        return widgets.ForeignKeyRawIdWidget(db_field.remote_field, self.admin_site, using=using)
+
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
         """
             Base function for django model admin class
@@ -134,13 +336,155 @@ class LimitForeignKeyAdmin:
         if queryset is not None:
             kwargs["queryset"] = queryset
         # noinspection PyUnresolvedReferences
+        if "widget" not in kwargs and db_field.name not in self.raw_id_fields:
+            # noinspection PyUnresolvedReferences
+            if db_field.name in self.get_autocomplete_fields(request):
+                kwargs["widget"] = self._get_autocomplete_widget(db_field, kwargs.get("using"))
+            elif self.foreignkey_widget_threshold is not None:
+                if queryset is None:
+                    queryset = db_field.remote_field.model._default_manager.using(
+                        kwargs.get("using")).complex_filter(db_field.get_limit_choices_to())
+                if self._get_foreignkey_count(db_field, queryset) > self.foreignkey_widget_threshold:
+                    kwargs["widget"] = self._get_large_foreignkey_widget(db_field, kwargs.get("using"))
+        # noinspection PyUnresolvedReferences
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
 
+class LimitAutocompleteAdmin:
+    """
+        Use this class in admin of related model, so autocomplete search of a LimitForeignKeyAdmin field
+        return objects of same limited queryset
+        Object of form is read from url of LimitAutocompleteSelect, results are not limited
+        when it is not in url or it is not found for user
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+            Limit autocomplete results with queryset of source admin
+        """
+        # noinspection PyUnresolvedReferences
+        queryset, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        source_field = self._get_autocomplete_source_field(request)
+        if source_field is None:
+            return queryset, may_have_duplicates
+        # noinspection PyUnresolvedReferences
+        source_admin = self.admin_site._registry.get(source_field.model)
+        if not isinstance(source_admin, LimitForeignKeyAdmin):
+            return queryset, may_have_duplicates
+        found, obj = self._get_autocomplete_source_obj(request, source_admin)
+        if not found:
+            return queryset, may_have_duplicates
+        with source_admin.use_foreignkey_obj(obj):
+            # noinspection PyProtectedMember
+            limit_queryset = source_admin._get_foreignkey_queryset(request, source_field.name)
+        if limit_queryset is not None:
+            to_field = source_field.remote_field.field_name
+            queryset = queryset.filter(**{f"{to_field}__in": limit_queryset.values(to_field)})
+        return queryset, may_have_duplicates
+
+    def _get_autocomplete_source_field(self, request):
+        resolver_match = getattr(request, "resolver_match", None)
+        if resolver_match is None or resolver_match.url_name != "autocomplete":
+            return None
+        try:
+            source_model = apps.get_model(request.GET["app_label"], request.GET["model_name"])
+            source_field = source_model._meta.get_field(request.GET["field_name"])
+        except (KeyError, LookupError, FieldDoesNotExist):
+            return None
+        # noinspection PyUnresolvedReferences
+        if not source_field.is_relation or source_field.remote_field.model != self.model:
+            return None
+        return source_field
+
+    @staticmethod
+    def _get_autocomplete_source_obj(request, source_admin):
+        """
+            Get (is found, object) of form of autocomplete, object is None in add form
+        """
+        object_id = request.GET.get(AUTOCOMPLETE_OBJECT_PARAM)
+        if object_id is None:
+            return False, None
+        if not object_id:
+            return True, None
+        obj = source_admin.get_object(request, unquote(object_id))
+        if obj is None or not source_admin.has_view_or_change_permission(request, obj):
+            return False, None
+        return True, obj
+
+
+class PaginatedInlineFormSet:
+    """
+        Use this class with inline formset for paginate forms and select related of queryset
+        Links of pages are rendered from `page_links` in "admin/inline_pagination.html"
+    """
+    page = 1
+    per_page = None
+    page_param = None
+    query_params = None
+    select_related = ()
+    total_count = None
+
+    def get_queryset(self):
+        """
+            Get one page of queryset
+        """
+        if not hasattr(self, "_queryset"):
+            # noinspection PyUnresolvedReferences
+            queryset = super().get_queryset()
+            if self.select_related:
+                queryset = queryset.select_related(*self.select_related)
+            if self.per_page:
+                self.total_count = queryset.count()
+                start = (self.page - 1) * self.per_page
+                queryset = queryset[start:start + self.per_page]
+            self._queryset = queryset
+        return self._queryset
+
+    @property
+    def page_count(self):
+        if not self.per_page:
+            return 1
+        self.get_queryset()
+        return max(1, -(-self.total_count // self.per_page))
+
+    @property
+    def page_links(self) -> list:
+        """
+            Get (page number, query string, is current page) of first, last and near pages
+            Number is None in place of skipped pages
+        """
+        page_count = self.page_count
+        numbers = sorted({1, page_count, *range(max(1, self.page - 3), min(page_count, self.page + 3) + 1)})
+        links = []
+        for number in numbers:
+            if links and number - links[-1][0] > 1:
+                links.append((None, None, False))
+            query_params = self.query_params.copy() if self.query_params is not None else QueryDict(mutable=True)
+            query_params[self.page_param] = number
+            links.append((number, query_params.urlencode(), number == self.page))
+        return links
+
+
+def _get_inline_name(inline_class):
+    return inline_class.__name__.lower()
+
+
 class InlineRelatedAdmin:
     """
         Use this class for change inline objects before showing
+        These options can be set in inline class:
+            inline_per_page: number of forms in each page, page number is read from `inline_page_param`
+            inline_page_param: default is "<formset prefix>_page"
+            inline_select_related: foreignkeys for select related, default is foreignkeys of inline form
+            inline_lazy: inline is not rendered in change page, it is rendered in "<object_id>/inline/<name>/"
+                and urls of these inlines are in `lazy_inlines` of change page context
+        Default change form template renders page links and loads lazy inlines in change form with
+        "django_autoutils/js/lazy-inline.js", add django_autoutils to INSTALLED_APPS for its templates and static.
+        Custom change form templates must include "admin/inline_pagination.html" after each inline and render
+        `lazy_inlines` as `<div class="js-lazy-inline" data-url="..." data-inlines-js="...">` inside the form
+        Media of widgets of lazy inlines must be in change page, like with Media of admin
     """
+    change_form_template = "admin/inline_related_change_form.html"
 
     def _handle_inline_obj(self, inline, obj):
         inline.instance = obj
@@ -151,18 +495,140 @@ class InlineRelatedAdmin:
     def _check_inline_obj(self, request, inline, obj):
         return True
 
-    def get_formsets_with_inlines(self, request, obj=None):
+    def _get_inline_select_related(self, request, inline, obj, formset):
+        select_related = getattr(inline, "inline_select_related", None)
+        if select_related is not None:
+            return select_related
+        form_fields = set(formset.form.base_fields) | set(inline.get_readonly_fields(request, obj))
+        parent_field = getattr(formset, "fk", None)
+        return [field.name for field in inline.model._meta.concrete_fields
+                if field.is_relation and field.name in form_fields and field != parent_field]
+
+    def _get_inline_formset(self, request, inline, obj):
         """
-        Yield formsets and the corresponding inlines.
+            Get formset of inline with pagination and select related
+        """
+        formset = inline.get_formset(request, obj)
+        select_related = self._get_inline_select_related(request, inline, obj, formset)
+        per_page = getattr(inline, "inline_per_page", None)
+        lazy = getattr(inline, "inline_lazy", False)
+        if not per_page and not select_related and not lazy:
+            return formset
+        prefix = formset.get_default_prefix()
+        if lazy:
+            # Lazy inline has its own prefix, so it is same in change page and lazy inline page
+            prefix = f"{prefix}_{_get_inline_name(inline.__class__)}"
+        page_param = getattr(inline, "inline_page_param", None) or f"{prefix}_page"
+        try:
+            page = max(int(request.GET.get(page_param, 1)), 1)
+        except ValueError:
+            page = 1
+        attrs = {
+            "page": page,
+            "per_page": per_page,
+            "page_param": page_param,
+            "query_params": request.GET.copy(),
+            "select_related": select_related,
+        }
+        if lazy:
+            attrs["get_default_prefix"] = classmethod(lambda cls: prefix)
+        return type(formset.__name__, (PaginatedInlineFormSet, formset), attrs)
+
+    def _is_inline_shown(self, request, inline, formset):
+        lazy_inline_name = getattr(request, "_lazy_inline_name", None)
+        if lazy_inline_name is not None:
+            return lazy_inline_name == _get_inline_name(inline.__class__)
+        if not getattr(inline, "inline_lazy", False):
+            return True
+        # Lazy inline is saved only when its forms are loaded in page
+        return f"{formset.get_default_prefix()}-TOTAL_FORMS" in request.POST
+
+    def _get_checked_inlines(self, request, obj):
+        """
+            Yield inline instances of object that user has permission and pass `_check_inline_obj`
         """
-        if not obj:
-            return
         # noinspection PyUnresolvedReferences
         for inline in self.get_inline_instances(request, obj):
             inline.request = request
             self._handle_inline_obj(inline, obj)
             if self._check_inline_obj(request, inline, obj):
-                yield inline.get_formset(request, obj), inline
+                yield inline
+
+    def get_formsets_with_inlines(self, request, obj=None):
+        """
+        Yield formsets and the corresponding inlines.
+        """
+        if not obj:
+            return
+        for inline in self._get_checked_inlines(request, obj):
+            formset = self._get_inline_formset(request, inline, obj)
+            if self._is_inline_shown(request, inline, formset):
+                yield formset, inline
+
+    def get_urls(self):
+        """
+            Add url of lazy inlines
+        """
+        # noinspection PyUnresolvedReferences
+        info = self.model._meta.app_label, self.model._meta.model_name
+        # noinspection PyUnresolvedReferences
+        return [
+            path("<path:object_id>/inline/<str:inline_name>/", self.admin_site.admin_view(self.lazy_inline_view),
+                 name="%s_%s_lazy_inline" % info),
+            *super().get_urls(),
+        ]
+
+    def change_view(self, request, object_id, form_url="", extra_context=None):
+        """
+            Add url of lazy inlines in context
+        """
+        # noinspection PyUnresolvedReferences
+        info = self.model._meta.app_label, self.model._meta.model_name
+        lazy_inlines = []
+        # noinspection PyUnresolvedReferences
+        if any(getattr(inline_class, "inline_lazy", False) for inline_class in self.inlines):
+            # Links are made for same inlines of lazy inline view, so users only see inlines that they can load
+            # noinspection PyUnresolvedReferences
+            obj = self.get_object(request, unquote(object_id))
+            if obj is not None:
+                # noinspection PyUnresolvedReferences
+                lazy_inlines = [{
+                    "name": _get_inline_name(inline.__class__),
+                    "verbose_name": inline.verbose_name_plural,
+                    "url": reverse("admin:%s_%s_lazy_inline" % info,
+                                   args=[object_id, _get_inline_name(inline.__class__)],
+                                   current_app=self.admin_site.name),
+                } for inline in self._get_checked_inlines(request, obj) if getattr(inline, "inline_lazy", False)]
+        if lazy_inlines:
+            extra_context = {**(extra_context or {}), "lazy_inlines": lazy_inlines}
+        # noinspection PyUnresolvedReferences
+        return super().change_view(request, object_id, form_url, extra_context=extra_context)
+
+    def lazy_inline_view(self, request, object_id, inline_name):
+        """
+            Render forms of one inline
+        """
+        # noinspection PyUnresolvedReferences
+        obj = self.get_object(request, unquote(object_id))
+        if obj is None:
+            raise Http404
+        # noinspection PyUnresolvedReferences
+        if not self.has_view_or_change_permission(request, obj):
+            raise PermissionDenied
+        request._lazy_inline_name = inline_name
+        # noinspection PyUnresolvedReferences
+        formsets, inline_instances = self._create_formsets(request, obj, change=True)
+        if not formsets:
+            raise Http404
+        # noinspection PyUnresolvedReferences
+        inline_admin_formset = self.get_inline_formsets(request, formsets, inline_instances, obj)[0]
+        # noinspection PyUnresolvedReferences
+        return TemplateResponse(request, "admin/lazy_inline.html", {
+            **self.admin_site.each_context(request),
+            "inline_admin_formset": inline_admin_formset,
+            "opts": self.model._meta,
+            "original": obj,
+        })
 
 
 def avatar_wrapper(func):
@@ -172,6 +638,7 @@ def avatar_wrapper(func):
             func : input function
     """
 
+    @functools.wraps(func)
     def wrapper(self, obj):
         """
             Same function for this job
@@ -200,7 +667,7 @@ class AvatarAdmin:
     def _get_avatar_obj(self, obj):
         return obj
 
-    @admin_display(description=_("icon"))
+    @admin_display(description=_("icon"), profile=True)
     @avatar_wrapper
     def avatar_icon(self, obj=None):
         """
@@ -208,7 +675,7 @@ class AvatarAdmin:
         """
         return get_edit_icon(obj, image_field=self.avatar_icon_field or self.avatar_field)
 
-    @admin_display(description=_("image"))
+    @admin_display(description=_("image"), profile=True)
     @avatar_wrapper
     def avatar_image(self, obj=None):
         """
@@ -227,7 +694,7 @@ class PrettyJsonAdmin:
     def _get_json_data(self, obj):
         return getattr(obj, self.DATA_FIELD, None)
 
-    @admin_display(description=_("pretty data"))
+    @admin_display(description=_("pretty data"), profile=True)
     def pretty_data(self, obj=None):
         """
             Get pretty html component and use in object admin panel
@@ -242,6 +709,39 @@ class PrettyJsonAdmin:
         return get_pretty_json(json_data)
 
 
+class ProfileDisplayAdmin:
+    """
+        Use this class for profile admin display callables in changelist
+        Callables of admin_display with `profile=True` are profiled when `display_profile` is True,
+        time and number of queries of each callable are logged and sent in Server-Timing header
+    """
+    display_profile = True
+
+    def changelist_view(self, request, extra_context=None):
+        """
+            Profile display callables while rendering changelist
+        """
+        if not self.display_profile:
+            # noinspection PyUnresolvedReferences
+            return super().changelist_view(request, extra_context=extra_context)
+        display_profile = DisplayProfile()
+        token = _display_profile.set(display_profile)
+        try:
+            with contextlib.ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(display_profile))
+                # noinspection PyUnresolvedReferences
+                response = super().changelist_view(request, extra_context=extra_context)
+                if hasattr(response, "render") and not response.is_rendered:
+                    response.render()
+        finally:
+            _display_profile.reset(token)
+        if display_profile.columns:
+            logger.info(f"display profile of {request.path}: {display_profile.get_summary()}")
+            response["Server-Timing"] = display_profile.get_server_timing()
+        return response
+
+
 class AbstractEditorAdmin:
     """
         Use this class for all models with editor and insert_dt and update_dt
@@ -262,6 +762,39 @@ class AdvanceSearchAdmin:
     change_list_template = 'admin/custom_change_list.html'
     search_form_data = None
     search_form = None
+    # Fields that are kept in full text index, search term and values of search form for these fields are
+    # searched in index
+    search_index_fields = None
+    search_index = None
+
+    def __init__(self, *args, **kwargs):
+        # noinspection PyArgumentList
+        super().__init__(*args, **kwargs)
+        if self.search_index_fields:
+            # noinspection PyUnresolvedReferences
+            self.search_index = get_search_index(self.model, self.search_index_fields)
+
+    def _get_search_form_terms(self, request):
+        if self.search_form is None:
+            return {}
+        search_form_data = self.search_form(request.GET)
+        if not search_form_data.is_valid():
+            return {}
+        return {name: value for name, value in search_form_data.cleaned_data.items()
+                if name in self.search_index_fields and value}
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+            Search in full text index and use default search if index is not available
+        """
+        if self.search_index is not None:
+            field_terms = self._get_search_form_terms(request)
+            if search_term or field_terms:
+                index_queryset = self.search_index.filter(queryset, search_term, field_terms)
+                if index_queryset is not None:
+                    return index_queryset, False
+        # noinspection PyUnresolvedReferences
+        return super().get_search_results(request, queryset, search_term)
 
     def changelist_view(self, request, extra_context=None):
         """
@@ -290,6 +823,10 @@ class AdvanceListFilter:
 
     @staticmethod
     def handle_list_filter(list_filters):
+        from admin_auto_filters.filters import AutocompleteFilterFactory
+        from django_admin_listfilter_dropdown.filters import RelatedDropdownFilter
+        from django_autoutils.admin_numeric_filter.admin import SingleNumericFilter, RangeNumericFilter
+
         obtained_list_filters = []
         for list_filter in list_filters:
             if type(list_filter) == tuple:
@@ -302,3 +839,196 @@ class AdvanceListFilter:
                 continue
             obtained_list_filters.append(list_filter)
         return obtained_list_filters
+
+
+class _ActiveChangeList:
+    """
+        Keep only active rows in changelist and its counts
+    """
+
+    def get_queryset(self, request, exclude_parameters=None):
+        self.root_queryset = get_active_scope_queryset(self.model_admin, request, self.root_queryset)
+        # noinspection PyUnresolvedReferences
+        return super().get_queryset(request, exclude_parameters)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_active_changelist(changelist):
+    return type(f"Active{changelist.__name__}", (_ActiveChangeList, changelist), {})
+
+
+class ActiveScopeAdmin:
+    """
+        Use this class for show only active rows in changelist, counts of list filters and numeric filters
+        Inactive rows are shown when is_active is used in list filter, change view shows all rows
+    """
+    active_scope = True
+
+    def is_active_scoped(self, request) -> bool:
+        return self.active_scope and not any(key.startswith("is_active") for key in request.GET)
+
+    def get_changelist(self, request, **kwargs):
+        # noinspection PyUnresolvedReferences
+        return _get_active_changelist(super().get_changelist(request, **kwargs))
+
+
+def _get_export_field_path(model, name):
+    """
+        Get fields of name if it is a path of single valued model fields
+    """
+    if not isinstance(name, str):
+        return None
+    try:
+        fields = get_fields_from_path(model, name)
+    except (FieldDoesNotExist, NotRelationField):
+        return None
+    if not fields[-1].concrete or any(field.many_to_many or field.one_to_many for field in fields):
+        return None
+    return fields
+
+
+def _get_export_value(value):
+    if isinstance(value, SafeData):
+        return html.unescape(strip_tags(value))
+    if isinstance(value, (Promise, models.Model)):
+        return str(value)
+    return value
+
+
+class ExportAdmin:
+    """
+        Use this class for add export actions of selected rows of changelist in csv and ndjson
+        Rows are read in chunks in primary key order and streamed, so memory does not grow with number of rows
+        Columns are model field paths or display callables, display callables with `batch` in admin_display are
+        called once for each chunk
+    """
+    # Field paths and display callables, list_display is used if it is not set
+    export_fields = None
+    export_formats = ("csv", "ndjson")
+    export_chunk_size = 2000
+    # Used for loading objects of display callables
+    export_select_related = None
+    export_prefetch_related = None
+
+    def get_export_fields(self, request):
+        if self.export_fields is not None:
+            return list(self.export_fields)
+        # noinspection PyUnresolvedReferences
+        return [name for name in self.get_list_display(request) if name != "action_checkbox"]
+
+    def _get_export_columns(self, request):
+        """
+            Get (key, label, field path, name) of columns, field path is None for display callables
+        """
+        columns = []
+        for name in self.get_export_fields(request):
+            fields = _get_export_field_path(self.model, name)
+            if fields is not None:
+                columns.append((name, " ".join(str(field.verbose_name) for field in fields), name, name))
+                continue
+            key = name if isinstance(name, str) else name.__name__
+            # noinspection PyTypeChecker
+            columns.append((key, str(label_for_field(name, self.model, self)), None, name))
+        return columns
+
+    def _get_export_objects(self, queryset, pks):
+        if self.export_select_related:
+            queryset = queryset.select_related(*self.export_select_related)
+        if self.export_prefetch_related:
+            queryset = queryset.prefetch_related(*self.export_prefetch_related)
+        return queryset.in_bulk(pks)
+
+    def _get_export_display_values(self, name, objs) -> list:
+        display = name if callable(name) else getattr(self, name, None)
+        batch = getattr(display, "batch", None)
+        if batch is None:
+            # noinspection PyTypeChecker
+            return [lookup_field(name, obj, self)[2] for obj in objs]
+        if inspect.ismethod(display):
+            return list(batch(display.__self__, objs))
+        return list(batch(objs))
+
+    def _iter_export_chunks(self, queryset, columns):
+        """
+            Yield values of rows of each chunk
+        """
+        # noinspection PyUnresolvedReferences
+        queryset = queryset.using(get_read_database(queryset.db)).order_by("pk")
+        field_paths = list(dict.fromkeys(field_path for _, _, field_path, _ in columns if field_path))
+        display_names = [name for _, _, field_path, name in columns if field_path is None]
+        last_pk = None
+        while True:
+            chunk_queryset = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            rows = list(chunk_queryset.values_list("pk", *field_paths)[:self.export_chunk_size])
+            if not rows:
+                return
+            last_pk = rows[-1][0]
+            displays = {}
+            if display_names:
+                objs = self._get_export_objects(queryset, [row[0] for row in rows])
+                # Rows that are deleted after reading values are not exported
+                rows = [row for row in rows if row[0] in objs]
+                objs = [objs[row[0]] for row in rows]
+                for name in display_names:
+                    displays[name if isinstance(name, str) else name.__name__] = self._get_export_display_values(
+                        name, objs)
+            chunk = []
+            for index, row in enumerate(rows):
+                values = dict(zip(field_paths, row[1:]))
+                chunk.append([_get_export_value(values[field_path] if field_path else displays[key][index])
+                              for key, _, field_path, _ in columns])
+            yield chunk
+
+    def _iter_csv(self, queryset, columns):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([label for _, label, _, _ in columns])
+        for chunk in self._iter_export_chunks(queryset, columns):
+            writer.writerows(chunk)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+
+    def _iter_ndjson(self, queryset, columns):
+        keys = [key for key, _, _, _ in columns]
+        for chunk in self._iter_export_chunks(queryset, columns):
+            yield "".join(json.dumps(dict(zip(keys, values)), cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+                          for values in chunk)
+
+    def export_response(self, request, queryset, export_format):
+        """
+            Stream rows of queryset in export format
+        """
+        columns = self._get_export_columns(request)
+        if export_format == "csv":
+            content, content_type = self._iter_csv(queryset, columns), "text/csv; charset=utf-8"
+        else:
+            content, content_type = self._iter_ndjson(queryset, columns), "application/x-ndjson; charset=utf-8"
+        response = StreamingHttpResponse(content, content_type=content_type)
+        file_name = f"{self.model._meta.model_name}_{timezone.now():%Y%m%d%H%M%S}.{export_format}"
+        response["Content-Disposition"] = f'attachment; filename="{file_name}"'
+        return response
+
+    @action(description=_("Export selected rows to csv"))
+    def export_csv(self, request, queryset):
+        return self.export_response(request, queryset, "csv")
+
+    @action(description=_("Export selected rows to ndjson"))
+    def export_ndjson(self, request, queryset):
+        return self.export_response(request, queryset, "ndjson")
+
+    def get_actions(self, request):
+        """
+            Add export actions
+        """
+        # noinspection PyUnresolvedReferences
+        actions = super().get_actions(request)
+        # noinspection PyUnresolvedReferences
+        if self.actions is None or IS_POPUP_VAR in request.GET or not self.has_view_permission(request):
+            return actions
+        for export_format in self.export_formats:
+            # noinspection PyUnresolvedReferences
+            export_action = self.get_action(f"export_{export_format}")
+            actions[export_action[1]] = export_action
+        return actions
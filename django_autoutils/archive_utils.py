@@ -0,0 +1,299 @@
+"""
+    Move old rows of models to archive tables and restore them
+    Archive table of each model has same columns without constraints and is named "<table>_archive"
+    Rows that point to archived rows are handled with rules:
+        ARCHIVE: related rows are archived with their parent, default for on_delete=CASCADE
+        SKIP: parents that have related rows are not archived, default for other on_delete options
+    Rules are set with label of related model, like {"app.Model": ARCHIVE}
+"""
+import functools
+import logging
+import operator
+
+from django.apps.registry import Apps
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, models, transaction, DEFAULT_DB_ALIAS
+
+logger = logging.getLogger("django_autoutils")
+
+ARCHIVE = "archive"
+SKIP = "skip"
+
+# Archive models are kept in a separate registry, so they are not seen in migrations
+archive_apps = Apps()
+_archive_models = {}
+
+_INTEGER_FIELDS = (
+    (models.BigAutoField, models.BigIntegerField),
+    (models.SmallAutoField, models.SmallIntegerField),
+    (models.AutoField, models.IntegerField),
+)
+
+_QUERY_CHUNK_SIZE = 500
+
+
+def _copy_field(field, **kwargs):
+    """
+        Copy field without constraints and auto increment
+    """
+    while field.is_relation:
+        field = field.target_field
+    for auto_field, integer_field in _INTEGER_FIELDS:
+        if isinstance(field, auto_field):
+            return integer_field(**kwargs)
+    _, _, args, field_kwargs = field.deconstruct()
+    field_kwargs.update(primary_key=False, unique=False, db_index=False)
+    field_kwargs.pop("auto_now", None)
+    field_kwargs.pop("auto_now_add", None)
+    field_kwargs.update(kwargs)
+    return field.__class__(*args, **field_kwargs)
+
+
+def get_archive_model(model):
+    """
+        Get model of archive table of model
+    """
+    if model in _archive_models:
+        return _archive_models[model]
+    if model._meta.parents:
+        raise TypeError(f"archive of multi table inheritance model {model._meta.label} is not supported")
+    attrs = {"__module__": model.__module__}
+    for field in model._meta.concrete_fields:
+        if field.primary_key:
+            attrs[field.attname] = _copy_field(field, primary_key=True, db_column=field.column)
+        elif field.is_relation:
+            attrs[field.attname] = _copy_field(field, null=True, db_index=True, db_column=field.column)
+        else:
+            # Columns are nullable, so columns of new fields can be added to tables that have rows
+            attrs[field.attname] = _copy_field(field, null=True, db_column=field.column)
+    attrs["Meta"] = type("Meta", (), {
+        "apps": archive_apps,
+        "app_label": model._meta.app_label,
+        "db_table": f"{model._meta.db_table}_archive",
+        "managed": False,
+    })
+    _archive_models[model] = type(f"{model.__name__}Archive", (models.Model,), attrs)
+    return _archive_models[model]
+
+
+def create_archive_table(model, using=DEFAULT_DB_ALIAS):
+    """
+        Create archive table of model if it is not created, columns of new fields of model are added to it
+        Rows that are archived before are filled with default of new fields
+        Columns of removed or renamed fields must be nullable, else ImproperlyConfigured is raised
+    """
+    archive_model = get_archive_model(model)
+    connection = connections[using]
+    table = archive_model._meta.db_table
+    if table not in connection.introspection.table_names():
+        with connection.schema_editor() as schema_editor:
+            schema_editor.create_model(archive_model)
+        return archive_model
+    with connection.cursor() as cursor:
+        columns = {column.name: column for column in connection.introspection.get_table_description(cursor, table)}
+    fields = archive_model._meta.concrete_fields
+    field_columns = {field.column for field in fields}
+    removed_columns = [name for name, column in columns.items() if name not in field_columns and not column.null_ok]
+    if removed_columns:
+        raise ImproperlyConfigured(f"columns {', '.join(removed_columns)} of {table} are not in {model._meta.label}, "
+                                   f"rename them like model or make them nullable")
+    new_fields = [field for field in fields if field.column not in columns]
+    if new_fields:
+        with connection.schema_editor() as schema_editor:
+            for field in new_fields:
+                logger.info(f"add column {field.column} to {table}")
+                schema_editor.add_field(archive_model, field)
+    return archive_model
+
+
+def _get_relations(model):
+    """
+        Get (related model, foreign key) of all foreign keys that point to model
+    """
+    return [(relation.related_model, relation.field) for relation in model._meta.get_fields(include_hidden=True)
+            if relation.auto_created and not relation.concrete and (relation.one_to_many or relation.one_to_one)]
+
+
+def _get_rule(rules, related_model, field):
+    rule = (rules or {}).get(related_model._meta.label)
+    if rule is None:
+        rule = ARCHIVE if field.remote_field.on_delete == models.CASCADE else SKIP
+    # Only foreign keys to primary key are followed
+    if field.target_field != field.remote_field.model._meta.pk:
+        return SKIP
+    return rule
+
+
+def _get_chunks(values):
+    values = list(values)
+    for index in range(0, len(values), _QUERY_CHUNK_SIZE):
+        yield values[index:index + _QUERY_CHUNK_SIZE]
+
+
+def _get_related_rows(related_model, field, pks, using):
+    rows = []
+    for chunk in _get_chunks(pks):
+        rows.extend(related_model._base_manager.using(using).filter(**{f"{field.attname}__in": chunk}).values_list(
+            "pk", field.attname))
+    return rows
+
+
+def _collect(model, pks, rules, using, ancestors=frozenset()):
+    """
+        Collect rows for archive
+        Returns:
+            pks of model that can be archived and list of (model, pks) of all rows, children are before parents
+    """
+    pks = set(pks)
+    relations = []
+    for related_model, field in _get_relations(model):
+        if not pks:
+            break
+        rows = _get_related_rows(related_model, field, pks, using)
+        if not rows:
+            continue
+        if _get_rule(rules, related_model, field) == SKIP:
+            pks.difference_update(fk for _, fk in rows)
+        else:
+            relations.append((related_model, rows))
+    while True:
+        collected = []
+        blocked_pks = set()
+        for related_model, rows in relations:
+            rows = [(pk, fk) for pk, fk in rows if fk in pks and (related_model, pk) not in ancestors]
+            if not rows:
+                continue
+            child_pks, child_collected = _collect(related_model, [pk for pk, _ in rows], rules, using,
+                                                  ancestors | {(model, pk) for pk in pks})
+            blocked_pks.update(fk for pk, fk in rows if pk not in child_pks)
+            collected.extend(child_collected)
+        if not blocked_pks:
+            break
+        pks -= blocked_pks
+    if pks:
+        collected.append((model, pks))
+    return pks, collected
+
+
+def _move_rows(source_model, target_model, pks, using):
+    """
+        Copy rows from source table to target table and delete them from source table
+    """
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+    columns = ", ".join(quote_name(field.column) for field in source_model._meta.concrete_fields)
+    source_table = quote_name(source_model._meta.db_table)
+    target_table = quote_name(target_model._meta.db_table)
+    pk_column = quote_name(source_model._meta.pk.column)
+    with connection.cursor() as cursor:
+        for chunk in _get_chunks(pks):
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(f"INSERT INTO {target_table} ({columns}) SELECT {columns} FROM {source_table} "
+                           f"WHERE {pk_column} IN ({placeholders})", chunk)
+            cursor.execute(f"DELETE FROM {source_table} WHERE {pk_column} IN ({placeholders})", chunk)
+
+
+def archive_batch(model, pks, rules=None, using=DEFAULT_DB_ALIAS) -> int:
+    """
+        Archive rows of model with their related rows in one transaction
+        Returns:
+            number of archived rows of model
+    """
+    with transaction.atomic(using=using):
+        pks = list(model._base_manager.using(using).select_for_update().filter(pk__in=pks).values_list(
+            "pk", flat=True))
+        archived_pks, collected = _collect(model, pks, rules, using)
+        for collected_model, collected_pks in collected:
+            _move_rows(collected_model, get_archive_model(collected_model), collected_pks, using)
+    return len(archived_pks)
+
+
+def archive_rows(model, before, inactive_only=False, batch_size=1000, rules=None, using=DEFAULT_DB_ALIAS):
+    """
+        Archive rows of model that are inserted before `before` in batches
+        Each batch is archived in a short transaction, so it can be stopped and run again
+        Yield number of archived rows after each batch
+    """
+    _create_archive_tables(model, rules, using)
+    queryset = model._base_manager.using(using).filter(insert_dt__lt=before).order_by("pk")
+    if inactive_only:
+        queryset = queryset.filter(is_active=False)
+    last_pk = None
+    while True:
+        batch_queryset = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        pks = list(batch_queryset.values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            return
+        last_pk = pks[-1]
+        count = archive_batch(model, pks, rules, using)
+        logger.info(f"archived {count} of {len(pks)} rows of {model._meta.label} up to pk {last_pk}")
+        yield count
+
+
+def _create_archive_tables(model, rules, using, created=None):
+    """
+        Create archive tables of model and related models that can be archived with it
+    """
+    if created is None:
+        created = set()
+    if model in created:
+        return
+    created.add(model)
+    create_archive_table(model, using)
+    for related_model, field in _get_relations(model):
+        if _get_rule(rules, related_model, field) == ARCHIVE:
+            _create_archive_tables(related_model, rules, using, created)
+
+
+def _check_restored_values(model, archive_model, pks, using):
+    """
+        Check archived rows have value of not null fields, columns of fields that are added after archive of rows
+        are empty when field has no default
+    """
+    empty_filters = {field.name: models.Q(**{f"{field.attname}__isnull": True})
+                     for field in model._meta.concrete_fields if not field.null and not field.primary_key}
+    if not empty_filters:
+        return
+    for chunk in _get_chunks(pks):
+        queryset = archive_model._base_manager.using(using).filter(pk__in=chunk)
+        if not queryset.filter(functools.reduce(operator.or_, empty_filters.values())).exists():
+            continue
+        empty_fields = [name for name, empty_filter in empty_filters.items() if queryset.filter(empty_filter).exists()]
+        raise ImproperlyConfigured(f"archived rows of {model._meta.label} have no value for "
+                                   f"{', '.join(empty_fields)}, set them in {archive_model._meta.db_table} first")
+
+
+def _restore(model, pks, rules, using, table_names, restored):
+    archive_model = get_archive_model(model)
+    if not pks or archive_model._meta.db_table not in table_names:
+        return
+    pks = [pk for pk in pks if (model, pk) not in restored]
+    pks = [pk for chunk in _get_chunks(pks)
+           for pk in archive_model._base_manager.using(using).filter(pk__in=chunk).values_list("pk", flat=True)]
+    if not pks:
+        return
+    _check_restored_values(model, archive_model, pks, using)
+    _move_rows(archive_model, model, pks, using)
+    restored.update((model, pk) for pk in pks)
+    for related_model, field in _get_relations(model):
+        if _get_rule(rules, related_model, field) != ARCHIVE:
+            continue
+        related_archive_model = get_archive_model(related_model)
+        if related_archive_model._meta.db_table not in table_names:
+            continue
+        rows = _get_related_rows(related_archive_model, related_archive_model._meta.get_field(field.attname),
+                                 pks, using)
+        _restore(related_model, [pk for pk, _ in rows], rules, using, table_names, restored)
+
+
+def restore_rows(model, pks, rules=None, using=DEFAULT_DB_ALIAS) -> int:
+    """
+        Move rows of model and their archived related rows from archive tables to main tables
+        Returns:
+            number of restored rows of model
+    """
+    _create_archive_tables(model, rules, using)
+    restored = set()
+    with transaction.atomic(using=using):
+        _restore(model, list(pks), rules, using, set(connections[using].introspection.table_names()), restored)
+    return len([pk for restored_model, pk in restored if restored_model == model])
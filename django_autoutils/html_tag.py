@@ -4,9 +4,6 @@ from django.urls import reverse, NoReverseMatch
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
-from pygments import highlight
-from pygments.formatters.html import HtmlFormatter
-from pygments.lexers.data import JsonLexer
 
 
 def get_edit_url(instance):
@@ -31,6 +28,10 @@ def get_button_link(url, text, title=""):
 
 def get_pretty_json(data):
     """Function to display pretty version of our data"""
+    # Pygments is imported on first use
+    from pygments import highlight
+    from pygments.formatters.html import HtmlFormatter
+    from pygments.lexers.data import JsonLexer
 
     # Convert the data to sorted, indented JSON
     response = json.dumps(data, sort_keys=True, indent=2, ensure_ascii=False)
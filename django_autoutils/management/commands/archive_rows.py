@@ -0,0 +1,77 @@
+"""
+    Move old rows of a model to its archive table or restore them
+"""
+import datetime
+
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime, parse_date
+
+from django_autoutils.archive_utils import archive_rows, restore_rows, ARCHIVE, SKIP
+
+
+class Command(BaseCommand):
+    help = "Move rows of model that are inserted before a time to archive table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", help="label of model, like app.Model")
+        parser.add_argument("--days", type=int, help="archive rows that are older than this days")
+        parser.add_argument("--before", help="archive rows that are inserted before this date or time")
+        parser.add_argument("--inactive-only", action="store_true", help="only archive rows with is_active=False")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--rule", action="append", default=[],
+                            help=f"rule of related model, like app.Model={ARCHIVE} or app.Model={SKIP}")
+        parser.add_argument("--restore", nargs="+", metavar="PK", help="restore rows with this primary keys")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    @staticmethod
+    def get_before(options):
+        if options["before"]:
+            before = parse_datetime(options["before"])
+            if before is None:
+                date = parse_date(options["before"])
+                if date is None:
+                    raise CommandError(f"invalid time {options['before']}")
+                before = datetime.datetime.combine(date, datetime.time())
+            if timezone.is_naive(before):
+                before = timezone.make_aware(before)
+            return before
+        if options["days"] is not None:
+            return timezone.now() - datetime.timedelta(days=options["days"])
+        raise CommandError("one of --days or --before is required")
+
+    @staticmethod
+    def get_rules(options):
+        rules = {}
+        for rule in options["rule"]:
+            label, _, value = rule.partition("=")
+            if value not in (ARCHIVE, SKIP):
+                raise CommandError(f"invalid rule {rule}")
+            rules[apps.get_model(label)._meta.label] = value
+        return rules
+
+    def handle(self, *args, **options):
+        try:
+            model = apps.get_model(options["model"])
+        except (LookupError, ValueError) as e:
+            raise CommandError(str(e))
+        rules = self.get_rules(options)
+        if options["restore"]:
+            try:
+                count = restore_rows(model, options["restore"], rules=rules, using=options["database"])
+            except ImproperlyConfigured as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f"{count} rows of {model._meta.label} are restored"))
+            return
+        total = 0
+        try:
+            for count in archive_rows(model, self.get_before(options), inactive_only=options["inactive_only"],
+                                      batch_size=options["batch_size"], rules=rules, using=options["database"]):
+                total += count
+                self.stdout.write(f"{total} rows are archived")
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f"{total} rows of {model._meta.label} are archived"))
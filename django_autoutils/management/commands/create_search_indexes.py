@@ -0,0 +1,22 @@
+"""
+    Create full text search indexes of admins
+"""
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from django_autoutils.search_utils import get_search_indexes
+
+
+class Command(BaseCommand):
+    help = "Create search indexes of search_index_fields of admins and index all rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        for search_index in get_search_indexes():
+            name = f"{search_index.model._meta.label} ({', '.join(field.name for field in search_index.fields)})"
+            if search_index.create(options["database"]):
+                self.stdout.write(self.style.SUCCESS(f"search index of {name} is created"))
+            else:
+                self.stdout.write(self.style.WARNING(f"search index of {name} is not supported"))
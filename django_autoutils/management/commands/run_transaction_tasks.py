@@ -0,0 +1,29 @@
+"""
+    Worker of queued model_transaction calls, more than one worker can be run together
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from django_autoutils.queue_utils import run_tasks
+
+
+class Command(BaseCommand):
+    help = "Run model_transaction calls that are queued because their object was locked"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100, help="tasks that are run before next check")
+        parser.add_argument("--sleep", type=float, default=1, help="seconds of wait when queue is empty")
+        parser.add_argument("--once", action="store_true", help="exit when queue is empty")
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            count = run_tasks(limit=options["batch_size"])
+            total += count
+            if count:
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["sleep"])
+        self.stdout.write(self.style.SUCCESS(f"{total} tasks are run"))
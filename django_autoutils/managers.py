@@ -1,4 +1,22 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
 from django.contrib.auth.base_user import BaseUserManager
+from django.contrib.auth.hashers import make_password
+from django.core.cache import caches
+from django.db import models, transaction, DEFAULT_DB_ALIAS
+
+
+def _setup_hash_worker(settings_module):
+    """
+        Setup django in password hash worker process
+    """
+    if settings_module:
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    import django
+    django.setup()
 
 
 class EmailUserManager(BaseUserManager):
@@ -40,3 +58,158 @@ class EmailUserManager(BaseUserManager):
             raise ValueError("Superuser must have is_superuser=True.")
 
         return self._create_user(email, password, **extra_fields)
+
+    def bulk_create_users(self, users_data, batch_size=1000, workers=None):
+        """
+            Create users in batches and yield (created users, skipped emails) after each batch
+            Emails that exist in database or repeated in input are skipped
+            Passwords are hashed in a process pool, with workers=1 they are hashed in current process
+            Args:
+                users_data: iterable of dict with email, password and extra fields of user
+                batch_size: number of users in each insert
+                workers: number of hash processes, default is number of cpus
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        seen_emails = set()
+        users_data = iter(users_data)
+        executor = None
+        if workers > 1:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_setup_hash_worker,
+                                           initargs=(os.environ.get("DJANGO_SETTINGS_MODULE"),))
+        try:
+            while batch := list(itertools.islice(users_data, batch_size)):
+                yield self._bulk_create_users_batch(batch, seen_emails, executor, workers)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    def _bulk_create_users_batch(self, batch, seen_emails, executor, workers):
+        users_data = {}
+        skipped_emails = []
+        for user_data in batch:
+            user_data = dict(user_data)
+            email = user_data.pop("email", None)
+            if not email:
+                raise ValueError("The given email must be set")
+            email = self.normalize_email(email).lower()
+            if email in seen_emails or email in users_data:
+                skipped_emails.append(email)
+                continue
+            user_data.setdefault("is_staff", False)
+            user_data.setdefault("is_superuser", False)
+            users_data[email] = user_data
+        exist_emails = set(self.filter(email__in=list(users_data)).values_list("email", flat=True))
+        for email in exist_emails:
+            users_data.pop(email)
+        skipped_emails.extend(exist_emails)
+        seen_emails.update(exist_emails)
+        seen_emails.update(users_data)
+        passwords = [user_data.pop("password", None) for user_data in users_data.values()]
+        if executor is None:
+            hashed_passwords = map(make_password, passwords)
+        else:
+            hashed_passwords = executor.map(make_password, passwords,
+                                            chunksize=max(1, len(passwords) // (workers * 4)))
+        users = []
+        for (email, user_data), hashed_password in zip(users_data.items(), hashed_passwords):
+            user = self.model(email=email, **user_data)
+            user.password = hashed_password
+            users.append(user)
+        with transaction.atomic(using=self.db):
+            users = self.bulk_create(users)
+        return users, skipped_emails
+
+
+def _get_active_count_cache():
+    return caches[getattr(settings, "AUTOUTILS_ACTIVE_COUNT_CACHE", "default")]
+
+
+def _get_active_count_key(model, using) -> str:
+    return f"autoutils:active_count:{using}:{model._meta.label_lower}"
+
+
+def get_active_count(model, using=DEFAULT_DB_ALIAS) -> int:
+    """
+        Get number of active rows of model from cache
+        Cache is cleared when rows are created, deleted or is_active of them is changed, rows that are deleted with
+        cascade are counted until AUTOUTILS_ACTIVE_COUNT_TIMEOUT
+    """
+    cache = _get_active_count_cache()
+    key = _get_active_count_key(model, using)
+    count = cache.get(key)
+    if count is None:
+        count = model._base_manager.using(using).filter(is_active=True).count()
+        cache.set(key, count, getattr(settings, "AUTOUTILS_ACTIVE_COUNT_TIMEOUT", 300))
+    return count
+
+
+def invalidate_active_count(model, using=DEFAULT_DB_ALIAS):
+    """
+        Clear cached active count of model after commit of transaction
+    """
+    key = _get_active_count_key(model, using)
+    transaction.on_commit(lambda: _get_active_count_cache().delete(key), using=using)
+
+
+class ActiveQuerySet(models.QuerySet):
+    """
+        Queryset of models with is_active, changes of active rows clear cached active count
+    """
+
+    def active(self):
+        return self.filter(is_active=True)
+
+    def inactive(self):
+        return self.filter(is_active=False)
+
+    def soft_delete(self) -> int:
+        """
+            Set is_active of rows to False
+        """
+        return self.update(is_active=False)
+
+    def active_count(self) -> int:
+        """
+            Count active rows, count of all active rows of model is read from cache
+        """
+        if not self.query.has_filters() and not self.query.is_sliced and not self.query.combinator:
+            return get_active_count(self.model, self.db)
+        return self.active().count()
+
+    def update(self, **kwargs):
+        count = super().update(**kwargs)
+        if "is_active" in kwargs:
+            invalidate_active_count(self.model, self.db)
+        return count
+
+    update.alters_data = True
+
+    def delete(self):
+        result = super().delete()
+        invalidate_active_count(self.model, self.db)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        invalidate_active_count(self.model, self.db)
+        return objs
+
+
+class AbstractManager(models.Manager.from_queryset(ActiveQuerySet)):
+    """
+        Default manager of AbstractModel, all rows are in queryset
+    """
+    pass
+
+
+class ActiveManager(AbstractManager):
+    """
+        Manager of active rows
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_active=True)
@@ -0,0 +1,103 @@
+"""
+    Message storage of requests that are made for background jobs
+    Settings:
+        AUTOUTILS_MESSAGE_LEVEL: minimum level of kept messages, MESSAGE_LEVEL is used if it is not set
+        AUTOUTILS_MESSAGE_MAX: maximum number of different messages that are kept
+"""
+import itertools
+import logging
+
+from django.conf import settings
+from django.contrib.messages.storage.base import BaseStorage, Message
+
+logger = logging.getLogger("django_autoutils")
+
+
+def is_message_enabled(request, level: int) -> bool:
+    """
+        Check message of level is kept in messages of request, use it before formatting message
+    """
+    storage = getattr(request, "_messages", None)
+    return storage is None or level >= storage.level
+
+
+class BufferedMessageStorage(BaseStorage):
+    """
+        Keep messages in memory, messages lower than level are dropped and same messages are kept once with counter
+        Number of different messages is limited and other messages are only counted
+    """
+
+    def __init__(self, request, level: int = None, max_messages: int = None, *args, **kwargs):
+        super().__init__(request, *args, **kwargs)
+        if level is None:
+            level = getattr(settings, "AUTOUTILS_MESSAGE_LEVEL", None)
+        if level is not None:
+            self.level = level
+        if max_messages is None:
+            max_messages = getattr(settings, "AUTOUTILS_MESSAGE_MAX", 1000)
+        self.max_messages = max_messages
+        self.counters = {}
+        self.dropped = 0
+
+    def _get(self, *args, **kwargs):
+        return [], True
+
+    def _store(self, messages, response, *args, **kwargs):
+        return []
+
+    def __len__(self):
+        return len(self.counters)
+
+    def __iter__(self):
+        self.used = True
+        return iter([Message(level, message, extra_tags) for level, message, extra_tags in self.counters])
+
+    def __contains__(self, item):
+        return (item.level, item.message, item.extra_tags) in self.counters
+
+    def add(self, level, message, extra_tags=""):
+        if not message:
+            return
+        level = int(level)
+        if level < self.level:
+            return
+        key = (level, str(message), str(extra_tags or ""))
+        count = self.counters.get(key)
+        if count is None and len(self.counters) >= self.max_messages:
+            self.dropped += 1
+            return
+        self.counters[key] = (count or 0) + 1
+        self.added_new = True
+
+    def get_summaries(self) -> list:
+        """
+            Get (level, message, extra tags, count) of kept messages
+        """
+        return [(level, message, extra_tags, count) for (level, message, extra_tags), count in self.counters.items()]
+
+    def flush(self, to_db=False, job: str = "", batch_size: int = 100):
+        """
+            Send summary of messages to logger or JobMessage table and clear messages
+            In logger messages of one level are sent together in batches
+        """
+        summaries = self.get_summaries()
+        if to_db:
+            from django_autoutils.models import JobMessage
+
+            JobMessage.objects.bulk_create([
+                JobMessage(job=job, level=level, message=message, extra_tags=extra_tags, count=count)
+                for level, message, extra_tags, count in summaries
+            ], batch_size=batch_size)
+        else:
+            prefix = f"{job}: " if job else ""
+            summaries.sort(key=lambda summary: summary[0])
+            for level, level_summaries in itertools.groupby(summaries, key=lambda summary: summary[0]):
+                level_summaries = list(level_summaries)
+                for index in range(0, len(level_summaries), batch_size):
+                    logger.log(level, prefix + "\n".join(
+                        f"{message} (x{count})" if count > 1 else message
+                        for _, message, _, count in level_summaries[index:index + batch_size]))
+        if self.dropped:
+            logger.warning(f"{job or 'job'}: {self.dropped} messages are dropped")
+        self.counters.clear()
+        self.dropped = 0
@@ -0,0 +1,125 @@
+"""
+    Metrics of transaction decorators
+"""
+import threading
+
+from django.dispatch import Signal
+from django.http import HttpResponse
+
+# Sent for every transaction event with event, function, model and duration arguments
+transaction_event = Signal()
+
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+TRANSACTION_METRICS = {
+    "acquire": ("autoutils_transaction_lock_acquire_seconds", "histogram", "Time for acquire lock of object"),
+    "hold": ("autoutils_transaction_lock_hold_seconds", "histogram", "Time of running function in locked object"),
+    "reject": ("autoutils_transaction_rejections_total", "counter", "Calls rejected because object is locked"),
+    "error": ("autoutils_transaction_errors_total", "counter", "Calls failed with error"),
+    "retry": ("autoutils_transaction_retries_total", "counter", "Calls that are run again"),
+    "enqueue": ("autoutils_transaction_enqueued_total", "counter", "Calls that are queued on lock contention"),
+}
+
+
+class MetricsRegistry:
+    """
+        In process registry of counters and histograms
+    """
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.metrics = {}
+
+    def _get_metric(self, name, kind, description):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = {"kind": kind, "description": description, "values": {}}
+        return metric
+
+    def inc(self, name, labels: dict, value=1, description=""):
+        """
+            Increase counter
+        """
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            values = self._get_metric(name, "counter", description)["values"]
+            values[key] = values.get(key, 0) + value
+
+    def observe(self, name, labels: dict, value: float, description=""):
+        """
+            Add value to histogram
+        """
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            values = self._get_metric(name, "histogram", description)["values"]
+            histogram = values.get(key)
+            if histogram is None:
+                histogram = values[key] = [0] * len(self.buckets) + [0, 0.0]
+            for index, bucket in enumerate(self.buckets):
+                if value <= bucket:
+                    histogram[index] += 1
+            histogram[-2] += 1
+            histogram[-1] += value
+
+    def record_transaction_event(self, event, function, model, duration=None):
+        """
+            Sink for transaction events
+        """
+        name, kind, description = TRANSACTION_METRICS[event]
+        labels = {"function": function, "model": model}
+        if kind == "histogram":
+            self.observe(name, labels, duration, description)
+        else:
+            self.inc(name, labels, description=description)
+
+    def clear(self):
+        with self.lock:
+            self.metrics.clear()
+
+    def export_prometheus(self) -> str:
+        """
+            Get all metrics in prometheus text format
+        """
+        lines = []
+        with self.lock:
+            for name, metric in sorted(self.metrics.items()):
+                lines.append(f"# HELP {name} {metric['description']}")
+                lines.append(f"# TYPE {name} {metric['kind']}")
+                for key, value in sorted(metric["values"].items()):
+                    labels = ",".join(f'{label}="{_escape_label(label_value)}"' for label, label_value in key)
+                    if metric["kind"] == "counter":
+                        lines.append(f"{name}{{{labels}}} {value}")
+                        continue
+                    for bucket, count in zip(self.buckets, value):
+                        lines.append(f'{name}_bucket{{{labels},le="{bucket}"}} {count}')
+                    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {value[-2]}')
+                    lines.append(f"{name}_count{{{labels}}} {value[-2]}")
+                    lines.append(f"{name}_sum{{{labels}}} {value[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+registry = MetricsRegistry()
+
+# Each sink is called with event, function, model and duration
+transaction_sinks = [registry.record_transaction_event]
+
+
+def record_transaction_event(event, function, model, duration=None):
+    """
+        Send transaction event to all sinks and transaction_event signal
+    """
+    for sink in transaction_sinks:
+        sink(event, function, model, duration)
+    transaction_event.send(sender=None, event=event, function=function, model=model, duration=duration)
+
+
+def metrics_view(request):
+    """
+        Export metrics for prometheus
+    """
+    return HttpResponse(registry.export_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.15 on 2026-10-19 07:19
+
+import django.core.serializers.json
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionTask',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('function', models.CharField(max_length=255, verbose_name='function')),
+                ('model', models.CharField(max_length=100, verbose_name='model')),
+                ('object_id', models.CharField(max_length=64, verbose_name='object id')),
+                ('user_id', models.CharField(blank=True, max_length=64, null=True, verbose_name='user id')),
+                ('args', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='args')),
+                ('kwargs', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='kwargs')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='attempts')),
+                ('error', models.TextField(blank=True, default='', verbose_name='error')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='run after')),
+                ('insert_dt', models.DateTimeField(auto_now_add=True, verbose_name='insert time')),
+            ],
+            options={
+                'verbose_name': 'transaction task',
+                'verbose_name_plural': 'transaction tasks',
+                'indexes': [models.Index(fields=['run_after', 'attempts'], name='autoutils_task_run_after')],
+                'constraints': [models.UniqueConstraint(fields=('function', 'model', 'object_id'), name='autoutils_task_unique_call')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.15 on 2026-10-19 07:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_autoutils', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobMessage',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('job', models.CharField(blank=True, db_index=True, max_length=255, verbose_name='job')),
+                ('level', models.PositiveSmallIntegerField(verbose_name='level')),
+                ('message', models.TextField(verbose_name='message')),
+                ('extra_tags', models.CharField(blank=True, max_length=255, verbose_name='extra tags')),
+                ('count', models.PositiveIntegerField(default=1, verbose_name='count')),
+                ('insert_dt', models.DateTimeField(auto_now_add=True, verbose_name='insert time')),
+            ],
+            options={
+                'verbose_name': 'job message',
+                'verbose_name_plural': 'job messages',
+            },
+        ),
+    ]
@@ -1,20 +1,28 @@
 """
     All utils for model
 """
+import functools
 import logging
 import os
 import string
-from typing import Callable
+import time
+from typing import Callable, Iterator, List
 
 from autoutils.script import id_generator
 from django.contrib.auth import get_user_model
 from django.contrib.messages import add_message
-from django.db import models, transaction, IntegrityError, OperationalError
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models, transaction, IntegrityError, OperationalError, DEFAULT_DB_ALIAS
+from django.db.models.signals import class_prepared
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from rest_framework import exceptions
 
 from django_autoutils.exceptions import RequestException
+from django_autoutils.managers import AbstractManager, ActiveManager, get_active_count, invalidate_active_count
+from django_autoutils.message_utils import is_message_enabled
+from django_autoutils.metric_utils import record_transaction_event
+from django_autoutils.queue_utils import enqueue_call, register_queued_function
 from django_autoutils.utils import get_request_obj
 
 logger = logging.getLogger("django_autoutils")
@@ -30,15 +38,86 @@ def slug_generator(first_char_size=3, num_size=4, last_char_size=3):
             f"{id_generator(last_char_size, string.ascii_uppercase)}")
 
 
-def model_transaction(nowait=False, just_check=False, current_user=False):
+@functools.lru_cache(maxsize=None)
+def _get_random_table(chars: str):
+    """
+        Get translate table for map random bytes to chars
+        Bytes that make modulo bias are deleted in translate
+    """
+    chars_size = len(chars)
+    limit = 256 - 256 % chars_size
+    table = bytes(ord(chars[index % chars_size]) for index in range(limit)) + bytes(256 - limit)
+    return table, bytes(range(limit, 256)), limit / 256
+
+
+def random_chars_generator(size: int, chars: str) -> bytearray:
+    """
+        Get `size` random ascii chars from `chars`
+        All random bytes are drawn from os.urandom in bulk and mapped with one translate call
+    """
+    table, deleted, ratio = _get_random_table(chars)
+    result = bytearray()
+    while len(result) < size:
+        result += os.urandom(int((size - len(result)) / ratio) + 8).translate(table, deleted)
+    del result[size:]
+    return result
+
+
+def _batch_generator(count: int, batch_size: int, parts, get_prefix: Callable = None) -> "Iterator[List[str]]":
+    """
+        Yield batches of random strings, each batch is written column by column in one preallocated buffer
+        Args:
+            count: number of all strings
+            batch_size: number of strings in each batch
+            parts: list of (size, chars) for each part of string
+            get_prefix: function for get same prefix of all strings in one batch
+    """
+    buffer = bytearray()
+    while count > 0:
+        size = min(count, batch_size)
+        prefix = get_prefix().encode("ascii") if get_prefix is not None else b""
+        width = len(prefix) + sum(part_size for part_size, _ in parts)
+        if len(buffer) != size * width:
+            buffer = bytearray(size * width)
+        for index, char in enumerate(prefix):
+            buffer[index::width] = bytes((char,)) * size
+        offset = len(prefix)
+        for part_size, chars in parts:
+            block = random_chars_generator(size * part_size, chars)
+            for index in range(part_size):
+                buffer[offset + index::width] = block[index * size:(index + 1) * size]
+            offset += part_size
+        text = buffer.decode("ascii")
+        yield [text[index:index + width] for index in range(0, len(text), width)]
+        count -= size
+
+
+def slug_batch_generator(count: int, batch_size: int = 10000, first_char_size=3, num_size=4,
+                         last_char_size=3) -> "Iterator[List[str]]":
+    """
+        Generate slugs in batches with same format of `slug_generator`
+    """
+    yield from _batch_generator(count, batch_size, (
+        (first_char_size, string.ascii_uppercase),
+        (num_size, string.digits),
+        (last_char_size, string.ascii_uppercase),
+    ))
+
+
+def model_transaction(nowait=False, just_check=False, current_user=False, enqueue=False):
     """
         Use this decorator for run input function in transaction
+        With `enqueue` calls that find object locked are queued and run later by `run_transaction_tasks` command,
+        arguments of these calls must be json serializable
     """
 
     def inner(func: Callable):
         """
             Class decorator for run in transaction
         """
+        function_name = f"{func.__module__}.{func.__qualname__}"
+        if enqueue:
+            register_queued_function(function_name, func, current_user)
 
         def wrapper(obj, request, *args, **kwargs):
             """
@@ -53,18 +132,32 @@ def model_transaction(nowait=False, just_check=False, current_user=False):
                 use_obj = request.user
             else:
                 use_obj = obj
-            if use_obj.is_in_updating(nowait=nowait or just_check):
+            model_name = use_obj._meta.label
+            start_time = time.perf_counter()
+            if use_obj.is_in_updating(nowait=nowait or just_check or enqueue):
+                if enqueue:
+                    enqueue_call(function_name, obj, request, args, kwargs, current_user)
+                    use_obj.message_log(request, logging.INFO, f"last progress not finished yet, queued")
+                    return
+                record_transaction_event("reject", function_name, model_name)
                 use_obj.message_log(request, logging.ERROR, f"last progress not finished yet")
                 return
             if just_check:
                 func(obj, request, *args, **kwargs)
                 return
+            lock_time = None
             try:
                 with transaction.atomic():
                     use_obj.select_for_update()
+                    lock_time = time.perf_counter()
+                    record_transaction_event("acquire", function_name, model_name, lock_time - start_time)
                     return func(obj, request, *args, **kwargs)
             except IntegrityError:
+                record_transaction_event("error", function_name, model_name)
                 obj.message_log(request, logging.ERROR, f"error run in transaction function {func.__name__}")
+            finally:
+                if lock_time is not None:
+                    record_transaction_event("hold", function_name, model_name, time.perf_counter() - lock_time)
 
         return wrapper
 
@@ -80,6 +173,7 @@ def view_transaction(get_object: "Callable" = None, nowait=False):
         """
             Class decorator for run in transaction
         """
+        function_name = f"{func.__module__}.{func.__qualname__}"
 
         def wrapper(view, request, *args, **kwargs):
             """
@@ -97,17 +191,27 @@ def view_transaction(get_object: "Callable" = None, nowait=False):
                 user_model = get_user_model()
                 if not isinstance(update_object, user_model):
                     raise exceptions.AuthenticationFailed("can not find user")
+            model_name = update_object._meta.label
+            start_time = time.perf_counter()
             if update_object.is_in_updating(nowait=nowait):
+                record_transaction_event("reject", function_name, model_name)
                 update_object.message_log(request, logging.ERROR, f"last progress not finished yet")
                 raise RequestException(request)
+            lock_time = None
             try:
                 with transaction.atomic():
                     new_update_object = update_object.select_for_update()
+                    lock_time = time.perf_counter()
+                    record_transaction_event("acquire", function_name, model_name, lock_time - start_time)
                     return func(view, request, new_update_object, *args, **kwargs)
             except IntegrityError as e:
+                record_transaction_event("error", function_name, model_name)
                 update_object.message_log(request, logging.ERROR, f"error run in transaction function {func.__name__}")
                 update_object.log(logging.ERROR, f"error run in transaction function {func.__name__}. error: {e}")
                 raise RequestException(request)
+            finally:
+                if lock_time is not None:
+                    record_transaction_event("hold", function_name, model_name, time.perf_counter() - lock_time)
 
         return wrapper
 
@@ -124,6 +228,15 @@ def time_random_generator():
     return f"{now_time}{random_char}"
 
 
+def time_random_batch_generator(count: int, batch_size: int = 10000) -> "Iterator[List[str]]":
+    """
+        Generate random chars by time in batches with same format of `time_random_generator`
+        Time is read once per batch
+    """
+    yield from _batch_generator(count, batch_size, ((8, string.ascii_lowercase + string.digits),),
+                                get_prefix=lambda: hex(int(timezone.now().timestamp()))[2:])
+
+
 def upload_file(instance, filename=None) -> str:
     """
         Upload user image
@@ -139,13 +252,50 @@ class AbstractModel(models.Model):
     """
     BASE_PERMISSION_OBJECT = None
     LOGGER = logger
+    # Fields or tuples of fields that get an index with condition is_active=True
+    ACTIVE_INDEX_FIELDS = ()
     is_active = models.BooleanField(_("is active"), default=True)
     insert_dt = models.DateTimeField(_("insert time"), auto_now_add=True)
     update_dt = models.DateTimeField(_("update time"), auto_now=True)
 
+    objects = AbstractManager()
+    active_objects = ActiveManager()
+
     class Meta:
         abstract = True
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_is_active = instance.__dict__.get("is_active")
+        return instance
+
+    def save(self, *args, **kwargs):
+        """
+            Clear cached active count when row is added or is_active is changed
+        """
+        changed = self._state.adding or self.is_active != getattr(self, "_loaded_is_active", None)
+        super().save(*args, **kwargs)
+        if changed:
+            invalidate_active_count(self.__class__, self._state.db)
+        self._loaded_is_active = self.is_active
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_active_count(self.__class__, self._state.db)
+        return result
+
+    def soft_delete(self):
+        """
+            Set is_active to False
+        """
+        self.is_active = False
+        self.save(update_fields=["is_active", "update_dt"])
+
+    @classmethod
+    def get_active_count(cls, using=None) -> int:
+        return get_active_count(cls, using or DEFAULT_DB_ALIAS)
+
     def _get_message(self, message):
         return f"'{self}': {message}"
 
@@ -175,7 +325,7 @@ class AbstractModel(models.Model):
     def class_message_log(cls, request, level: int, message: str, extra: dict = None):
         if request is None:
             request = get_request_obj()
-        if request is not None:
+        if request is not None and is_message_enabled(request, level):
             add_message(request, level, message)
         cls.class_log(level=level, message=message, extra=extra)
 
@@ -185,7 +335,7 @@ class AbstractModel(models.Model):
         """
         if request is None:
             request = get_request_obj()
-        if request is not None:
+        if request is not None and is_message_enabled(request, level):
             add_message(request, level, self._get_message(message))
         self.log(level=level, message=message, extra=extra)
 
@@ -254,6 +404,40 @@ class AbstractModel(models.Model):
         return self.queryset().update(**data)
 
 
+def _add_active_indexes(sender, **kwargs):
+    """
+        Add partial indexes of ACTIVE_INDEX_FIELDS to AbstractModel subclasses
+        Fields must be local fields of model, ACTIVE_INDEX_FIELDS that is inherited from a concrete parent is
+        already indexed in table of parent
+    """
+    if not issubclass(sender, AbstractModel) or sender._meta.abstract or sender._meta.proxy:
+        return
+    if not sender.ACTIVE_INDEX_FIELDS:
+        return
+    local_fields = {field.name for field in sender._meta.local_fields}
+    if sender._meta.parents and "ACTIVE_INDEX_FIELDS" not in sender.__dict__:
+        return
+    if "is_active" not in local_fields:
+        raise ImproperlyConfigured(f"{sender._meta.label}: ACTIVE_INDEX_FIELDS needs is_active in table of model")
+    indexes = []
+    for fields in sender.ACTIVE_INDEX_FIELDS:
+        if isinstance(fields, str):
+            fields = (fields,)
+        missing_fields = [field for field in fields if field.lstrip("-") not in local_fields]
+        if missing_fields:
+            raise ImproperlyConfigured(f"{sender._meta.label}: {', '.join(missing_fields)} of ACTIVE_INDEX_FIELDS "
+                                       f"are not fields of model")
+        index = models.Index(fields=list(fields), condition=models.Q(is_active=True), name="active")
+        index.set_name_with_model(sender)
+        # Name of index on same fields without condition ends with _idx
+        index.name = f"{index.name[:-len(index.suffix)]}act"
+        indexes.append(index)
+    sender._meta.indexes = [*sender._meta.indexes, *indexes]
+
+
+class_prepared.connect(_add_active_indexes)
+
+
 class AbstractSlugModel(AbstractModel):
     slug = models.SlugField(unique=True, editable=False, blank=True)
 
@@ -270,3 +454,22 @@ class AbstractSlugModel(AbstractModel):
             if not self.__class__.objects.filter(slug=new_slug).exists():
                 self.slug = new_slug
         super().save(*args, **kwargs)
+
+    @classmethod
+    def set_bulk_slug(cls, objs):
+        """
+            Add slug to objects before bulk_create, check duplicates with one query for all objects
+        """
+        objs = [obj for obj in objs if not obj.slug]
+        while objs:
+            slugs = next(slug_batch_generator(len(objs), batch_size=len(objs)))
+            # noinspection PyUnresolvedReferences
+            used_slugs = set(cls.objects.filter(slug__in=slugs).values_list("slug", flat=True))
+            remain_objs = []
+            for obj, slug in zip(objs, slugs):
+                if slug in used_slugs:
+                    remain_objs.append(obj)
+                    continue
+                used_slugs.add(slug)
+                obj.slug = slug
+            objs = remain_objs
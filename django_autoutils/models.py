@@ -0,0 +1,58 @@
+"""
+    Models of django autoutils, add django_autoutils to INSTALLED_APPS for use them
+"""
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class TransactionTask(models.Model):
+    """
+        Call of model_transaction function that is queued because its object was locked
+        There is one row for each function and object, later calls update arguments of the row
+    """
+    id = models.BigAutoField(primary_key=True)
+    function = models.CharField(_("function"), max_length=255)
+    model = models.CharField(_("model"), max_length=100)
+    object_id = models.CharField(_("object id"), max_length=64)
+    user_id = models.CharField(_("user id"), max_length=64, null=True, blank=True)
+    args = models.JSONField(_("args"), default=list, encoder=DjangoJSONEncoder)
+    kwargs = models.JSONField(_("kwargs"), default=dict, encoder=DjangoJSONEncoder)
+    attempts = models.PositiveIntegerField(_("attempts"), default=0)
+    error = models.TextField(_("error"), blank=True, default="")
+    run_after = models.DateTimeField(_("run after"), default=timezone.now)
+    insert_dt = models.DateTimeField(_("insert time"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("transaction task")
+        verbose_name_plural = _("transaction tasks")
+        constraints = [
+            models.UniqueConstraint(fields=["function", "model", "object_id"], name="autoutils_task_unique_call"),
+        ]
+        indexes = [
+            models.Index(fields=["run_after", "attempts"], name="autoutils_task_run_after"),
+        ]
+
+    def __str__(self):
+        return f"{self.function}({self.model}:{self.object_id})"
+
+
+class JobMessage(models.Model):
+    """
+        Summary of messages of a background job, count is number of same messages
+    """
+    id = models.BigAutoField(primary_key=True)
+    job = models.CharField(_("job"), max_length=255, blank=True, db_index=True)
+    level = models.PositiveSmallIntegerField(_("level"))
+    message = models.TextField(_("message"))
+    extra_tags = models.CharField(_("extra tags"), max_length=255, blank=True)
+    count = models.PositiveIntegerField(_("count"), default=1)
+    insert_dt = models.DateTimeField(_("insert time"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("job message")
+        verbose_name_plural = _("job messages")
+
+    def __str__(self):
+        return f"{self.job}: {self.message}"
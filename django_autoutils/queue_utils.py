@@ -0,0 +1,142 @@
+"""
+    Queue of model_transaction calls that are rejected because their object is locked
+    Calls are kept in TransactionTask table and are run with `run_transaction_tasks` command
+    Settings:
+        AUTOUTILS_TASK_MAX_ATTEMPTS: failed calls are tried this number of times
+        AUTOUTILS_TASK_RETRY_DELAY: seconds before trying a locked or failed call again
+"""
+import datetime
+import logging
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction, DatabaseError
+from django.utils import timezone
+
+from django_autoutils.metric_utils import record_transaction_event
+from django_autoutils.utils import get_empty_request
+
+logger = logging.getLogger("django_autoutils")
+
+# Functions of model_transaction with enqueue, function name -> (function, current_user)
+_queued_functions = {}
+
+
+def get_max_attempts() -> int:
+    return getattr(settings, "AUTOUTILS_TASK_MAX_ATTEMPTS", 5)
+
+
+def get_retry_delay() -> float:
+    return getattr(settings, "AUTOUTILS_TASK_RETRY_DELAY", 5)
+
+
+def register_queued_function(function_name, func, current_user=False):
+    _queued_functions[function_name] = (func, current_user)
+
+
+def enqueue_call(function_name, obj, request, args, kwargs, current_user=False):
+    """
+        Add call to queue, pending call of same function and object is replaced with this call
+    """
+    from django_autoutils.models import TransactionTask
+
+    user_id = None
+    if current_user:
+        user_id = str(request.user.pk)
+    task = TransactionTask(function=function_name, model=obj._meta.label, object_id=str(obj.pk), user_id=user_id,
+                           args=list(args), kwargs=kwargs)
+    TransactionTask.objects.bulk_create(
+        [task], update_conflicts=True, unique_fields=["function", "model", "object_id"],
+        update_fields=["user_id", "args", "kwargs", "attempts", "error", "run_after"])
+    record_transaction_event("enqueue", function_name, obj._meta.label)
+
+
+def _postpone_task(task, error=None):
+    if error is not None:
+        task.attempts += 1
+        task.error = error
+    delay = get_retry_delay() * 2 ** max(task.attempts - 1, 0)
+    task.run_after = timezone.now() + datetime.timedelta(seconds=delay)
+    task.save(update_fields=["attempts", "error", "run_after"])
+
+
+def _lock_object(obj):
+    """
+        Lock object without waiting, return None if it is locked
+    """
+    try:
+        with transaction.atomic():
+            return obj.queryset().select_for_update(nowait=True).get()
+    except DatabaseError:
+        return None
+
+
+def _run_task(task):
+    """
+        Run claimed task in transaction of claim
+    """
+    if task.function not in _queued_functions:
+        logger.error(f"function of transaction task {task} is not registered")
+        _postpone_task(task, error="function is not registered")
+        return
+    func, current_user = _queued_functions[task.function]
+    try:
+        # Errors of bad values are rolled back to this savepoint, so task can be updated in claim transaction
+        with transaction.atomic():
+            obj = apps.get_model(task.model)._base_manager.filter(pk=task.object_id).first()
+            user = None
+            if current_user:
+                user = get_user_model()._base_manager.filter(pk=task.user_id).first()
+    except Exception as e:
+        logger.error(f"can not load objects of transaction task {task}. error: {e}")
+        _postpone_task(task, error=f"can not load objects: {e}")
+        return
+    if obj is None or (current_user and user is None):
+        logger.warning(f"object or user of transaction task {task} is deleted")
+        task.delete()
+        return
+    request = get_empty_request()
+    use_obj = obj
+    if current_user:
+        request.user = use_obj = user
+    model_name = use_obj._meta.label
+    start_time = time.perf_counter()
+    if _lock_object(use_obj) is None:
+        record_transaction_event("retry", task.function, model_name)
+        _postpone_task(task)
+        return
+    lock_time = time.perf_counter()
+    record_transaction_event("acquire", task.function, model_name, lock_time - start_time)
+    try:
+        with transaction.atomic():
+            func(obj, request, *task.args, **task.kwargs)
+    except Exception as e:
+        record_transaction_event("error", task.function, model_name)
+        logger.exception(f"transaction task {task} failed")
+        _postpone_task(task, error=str(e))
+    else:
+        task.delete()
+    finally:
+        record_transaction_event("hold", task.function, model_name, time.perf_counter() - lock_time)
+
+
+def run_tasks(limit=100) -> int:
+    """
+        Claim and run ready tasks one by one, tasks that are claimed by other workers are skipped
+        Returns:
+            number of claimed tasks
+    """
+    from django_autoutils.models import TransactionTask
+
+    count = 0
+    while count < limit:
+        with transaction.atomic():
+            task = TransactionTask.objects.select_for_update(skip_locked=True).filter(
+                run_after__lte=timezone.now(), attempts__lt=get_max_attempts()).order_by("run_after", "id").first()
+            if task is None:
+                break
+            _run_task(task)
+        count += 1
+    return count
@@ -0,0 +1,90 @@
+"""
+    Send heavy read only queries to replica database
+    Settings:
+        AUTOUTILS_REPLICA_DATABASE: alias of replica database, replica is not used if it is not set
+        AUTOUTILS_REPLICA_STALENESS: seconds after a write that reads of same request or client go to primary
+    Add ReplicaRouter to DATABASE_ROUTERS for detect writes and ReplicaPinMiddleware to MIDDLEWARE for keep
+    reads of a client on primary in next requests after a write
+"""
+import contextvars
+import math
+import time
+
+from django.conf import settings
+from django.db import connections, DEFAULT_DB_ALIAS
+
+PIN_COOKIE_NAME = "autoutils_primary_pin"
+
+_last_write_time = contextvars.ContextVar("last_write_time", default=None)
+
+
+def get_replica_database():
+    alias = getattr(settings, "AUTOUTILS_REPLICA_DATABASE", None)
+    if alias is None or alias not in connections.databases:
+        return None
+    return alias
+
+
+def get_replica_staleness() -> float:
+    return getattr(settings, "AUTOUTILS_REPLICA_STALENESS", 5)
+
+
+def pin_primary(write_time: float = None):
+    """
+        Read from primary for staleness seconds
+    """
+    _last_write_time.set(time.time() if write_time is None else write_time)
+
+
+def is_primary_pinned() -> bool:
+    last_write_time = _last_write_time.get()
+    return last_write_time is not None and time.time() - last_write_time < get_replica_staleness()
+
+
+def get_read_database(using: str = DEFAULT_DB_ALIAS) -> str:
+    """
+        Get database for heavy read only query of `using` database
+        Replica is used only for default database and when primary is not pinned
+    """
+    if using != DEFAULT_DB_ALIAS:
+        return using
+    replica = get_replica_database()
+    if replica is None or is_primary_pinned():
+        return using
+    return replica
+
+
+class ReplicaRouter:
+    """
+        Pin primary on every write
+    """
+
+    def db_for_write(self, model, **hints):
+        pin_primary()
+        return None
+
+
+class ReplicaPinMiddleware:
+    """
+        Keep reads of client on primary for staleness seconds after its last write
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        last_write_time = None
+        try:
+            last_write_time = float(request.COOKIES[PIN_COOKIE_NAME])
+        except (KeyError, ValueError):
+            pass
+        token = _last_write_time.set(last_write_time)
+        try:
+            response = self.get_response(request)
+            request_write_time = _last_write_time.get()
+        finally:
+            _last_write_time.reset(token)
+        if request_write_time is not None and request_write_time != last_write_time:
+            response.set_cookie(PIN_COOKIE_NAME, str(request_write_time), max_age=math.ceil(get_replica_staleness()),
+                                httponly=True, samesite="Lax")
+        return response
@@ -0,0 +1,206 @@
+"""
+    Full text search index for admin search
+"""
+import logging
+import math
+import re
+import time
+
+from django.db import connections, transaction
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger("django_autoutils")
+
+_search_indexes = {}
+
+
+def get_search_tokens(text) -> list:
+    """
+        Split text to words, only word chars are used in index queries
+    """
+    return re.findall(r"\w+", str(text))
+
+
+class SearchIndex:
+    """
+        Full text index of some fields of one model
+        In sqlite an fts5 table is kept in sync with triggers, so rows of bulk_create, queryset.update and raw
+        queries are indexed too, in postgresql a gin index on tsvector of fields is used
+        Index is created with `create_search_indexes` command, searches use default search until it is created
+    """
+    POSTGRES_CONFIG = "simple"
+    CHECK_INTERVAL = 60
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = [model._meta.get_field(field) for field in fields]
+        self.ready_databases = set()
+        # Database alias -> time of last check that index was missing
+        self.missing_databases = {}
+
+    @property
+    def table_name(self):
+        return f"{self.model._meta.db_table}_fts"
+
+    def _get_trigger_names(self) -> list:
+        return [f"{self.table_name}_{action}" for action in ("insert", "delete", "update")]
+
+    def _get_postgres_expression(self, connection):
+        quote_name = connection.ops.quote_name
+        document = " || ' ' || ".join(f"coalesce({quote_name(field.column)}::text, '')" for field in self.fields)
+        return f"to_tsvector('{self.POSTGRES_CONFIG}'::regconfig, {document})"
+
+    def _create_index(self, connection):
+        quote_name = connection.ops.quote_name
+        table = quote_name(self.model._meta.db_table)
+        columns = ", ".join(quote_name(field.column) for field in self.fields)
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                # Table and triggers are made again, so changes of fields are applied
+                for trigger_name in self._get_trigger_names():
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {quote_name(trigger_name)}")
+                index_table = quote_name(self.table_name)
+                cursor.execute(f"DROP TABLE IF EXISTS {index_table}")
+                cursor.execute(f"CREATE VIRTUAL TABLE {index_table} USING fts5({columns})")
+                self._fill_index(cursor, connection)
+                self._create_triggers(cursor, connection)
+            else:
+                # Concurrently index is built without blocking writes of table, it can not be run in transaction
+                cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {quote_name(self.table_name)} ON {table} "
+                               f"USING gin ({self._get_postgres_expression(connection)})")
+
+    def _fill_index(self, cursor, connection):
+        quote_name = connection.ops.quote_name
+        columns = ", ".join(quote_name(field.column) for field in self.fields)
+        cursor.execute(f"INSERT INTO {quote_name(self.table_name)} (rowid, {columns}) "
+                       f"SELECT {quote_name(self.model._meta.pk.column)}, {columns} "
+                       f"FROM {quote_name(self.model._meta.db_table)}")
+
+    def _create_triggers(self, cursor, connection):
+        """
+            Create triggers of sqlite that change fts5 table with insert, delete and update of rows of model
+        """
+        quote_name = connection.ops.quote_name
+        table = quote_name(self.model._meta.db_table)
+        index_table = quote_name(self.table_name)
+        columns = ", ".join(quote_name(field.column) for field in self.fields)
+        pk_column = quote_name(self.model._meta.pk.column)
+        values = ", ".join(f"new.{quote_name(field.column)}" for field in self.fields)
+        insert_sql = f"INSERT INTO {index_table} (rowid, {columns}) VALUES (new.{pk_column}, {values});"
+        delete_sql = f"DELETE FROM {index_table} WHERE rowid = old.{pk_column};"
+        insert_trigger, delete_trigger, update_trigger = map(quote_name, self._get_trigger_names())
+        cursor.execute(f"CREATE TRIGGER {insert_trigger} AFTER INSERT ON {table} BEGIN {insert_sql} END")
+        cursor.execute(f"CREATE TRIGGER {delete_trigger} AFTER DELETE ON {table} BEGIN {delete_sql} END")
+        cursor.execute(f"CREATE TRIGGER {update_trigger} AFTER UPDATE ON {table} BEGIN {delete_sql} {insert_sql} END")
+
+    def is_supported(self, using) -> bool:
+        connection = connections[using]
+        if connection.vendor == "postgresql":
+            return True
+        return connection.vendor == "sqlite" and self.model._meta.pk.get_internal_type() in (
+            "AutoField", "BigAutoField", "SmallAutoField", "IntegerField", "BigIntegerField")
+
+    def _index_exists(self, connection) -> bool:
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                # Update trigger is made last, index without it is not in sync
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = %s",
+                               [self._get_trigger_names()[-1]])
+                return cursor.fetchone() is not None
+            cursor.execute("SELECT 1 FROM pg_indexes WHERE indexname = %s", [self.table_name])
+            return cursor.fetchone() is not None
+
+    def is_ready(self, using) -> bool:
+        """
+            Check index is created in database, missing index is checked again after CHECK_INTERVAL seconds
+            Index is not created here, use `create_search_indexes` command or `create`
+        """
+        if using in self.ready_databases:
+            return True
+        if time.monotonic() - self.missing_databases.get(using, -math.inf) < self.CHECK_INTERVAL:
+            return False
+        if self.is_supported(using) and self._index_exists(connections[using]):
+            self.ready_databases.add(using)
+            self.missing_databases.pop(using, None)
+            return True
+        self.missing_databases[using] = time.monotonic()
+        return False
+
+    def create(self, using="default"):
+        """
+            Create index and fill it with all rows, run it outside of requests, like in deploy
+        """
+        if not self.is_supported(using):
+            logger.warning(f"search index of {self.model._meta.label} is not supported in database {using}")
+            return False
+        connection = connections[using]
+        if connection.vendor == "sqlite":
+            with transaction.atomic(using=using):
+                self._create_index(connection)
+        else:
+            self._create_index(connection)
+        self.ready_databases.add(using)
+        self.missing_databases.pop(using, None)
+        return True
+
+    def rebuild(self, using="default"):
+        """
+            Create index if it is not created and index all rows again
+        """
+        return self.create(using)
+
+    def filter(self, queryset, search_term="", field_terms: dict = None):
+        """
+            Filter queryset with index
+            Args:
+                queryset: queryset of model
+                search_term: words that must be in one of fields
+                field_terms: dictionary of field name and words that must be in this field
+            Returns:
+                filtered queryset or None if index is not available
+        """
+        if not self.is_ready(queryset.db):
+            return None
+        if field_terms is None:
+            field_terms = {}
+        fields = {field.name: field for field in self.fields}
+        tokens = get_search_tokens(search_term)
+        field_tokens = [(fields[name], get_search_tokens(value)) for name, value in field_terms.items()
+                        if name in fields]
+        if not tokens and not any(words for _, words in field_tokens):
+            return queryset
+        connection = connections[queryset.db]
+        quote_name = connection.ops.quote_name
+        if connection.vendor == "sqlite":
+            match = [f'"{token}"*' for token in tokens]
+            for field, words in field_tokens:
+                match.extend(f'{field.column} : "{word}"*' for word in words)
+            return queryset.filter(pk__in=RawSQL(
+                f"SELECT rowid FROM {quote_name(self.table_name)} WHERE {quote_name(self.table_name)} MATCH %s",
+                [" AND ".join(match)]))
+        # Index is on all fields, words of one field are checked again on that field
+        for field, words in field_tokens:
+            tokens.extend(words)
+            for word in words:
+                queryset = queryset.filter(**{f"{field.name}__icontains": word})
+        return queryset.filter(pk__in=RawSQL(
+            f"SELECT {quote_name(self.model._meta.pk.column)} FROM {quote_name(self.model._meta.db_table)} "
+            f"WHERE {self._get_postgres_expression(connection)} @@ to_tsquery(%s::regconfig, %s)",
+            [self.POSTGRES_CONFIG, " & ".join(f"{token}:*" for token in tokens)]))
+
+
+def get_search_index(model, fields) -> "SearchIndex":
+    """
+        Get one search index for each model and fields
+    """
+    key = (model, tuple(fields))
+    if key not in _search_indexes:
+        _search_indexes[key] = SearchIndex(model, fields)
+    return _search_indexes[key]
+
+
+def get_search_indexes() -> list:
+    """
+        Get all search indexes, indexes of admins are made when admins are registered
+    """
+    return list(_search_indexes.values())
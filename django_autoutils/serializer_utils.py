@@ -1,7 +1,12 @@
 """
     Some good utils for serializer
 """
+from django.db import models, transaction
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
 from rest_framework.fields import HiddenField, CurrentUserDefault
+from rest_framework.utils import model_meta
+from rest_framework.validators import UniqueValidator
 
 
 class ContextFieldSerializer:
@@ -32,3 +37,182 @@ def get_current_user_default():
         Use this function in serializer field for access to current user
     """
     return HiddenField(default=CurrentUserDefault())
+
+
+class ValuesListSerializer(serializers.ListSerializer):
+    """
+        Serialize queryset with queryset.values() rows and skip model instantiation
+    """
+
+    def to_representation(self, data):
+        if isinstance(data, models.Manager):
+            data = data.all()
+        if isinstance(data, models.QuerySet):
+            data = data.values(*self.child.get_values_fields())
+        return [self.child.to_representation(item) for item in data]
+
+
+class ValuesSerializer(serializers.BaseSerializer):
+    """
+        Read only serializer for rows of queryset.values()
+        Converters of fields are compiled once from fields of `model_serializer_class`
+    """
+    model_serializer_class = None
+    # These fields return same value for values() rows
+    IDENTITY_FIELDS = (serializers.BooleanField, serializers.CharField, serializers.IntegerField,
+                       serializers.PrimaryKeyRelatedField)
+
+    @classmethod
+    def get_converters(cls):
+        """
+            Get list of (field name, values key, converter) for this class
+        """
+        converters = cls.__dict__.get("_converters")
+        if converters is not None:
+            return converters
+        converters = []
+        for name, field in cls.model_serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, (serializers.BaseSerializer, serializers.ManyRelatedField,
+                                  serializers.SerializerMethodField)) or field.source == "*" or (
+                    isinstance(field, serializers.RelatedField) and
+                    not isinstance(field, serializers.PrimaryKeyRelatedField)):
+                raise TypeError(f"field {name} of {cls.model_serializer_class.__name__} "
+                                f"can not be read from values() rows")
+            if isinstance(field, cls.IDENTITY_FIELDS) and not isinstance(field, serializers.ChoiceField):
+                converter = None
+            else:
+                converter = field.to_representation
+            converters.append((name, "__".join(field.source_attrs), converter))
+        cls._converters = converters
+        return converters
+
+    @classmethod
+    def get_values_fields(cls):
+        return [key for _, key, _ in cls.get_converters()]
+
+    def to_representation(self, instance):
+        if not isinstance(instance, dict):
+            return self.model_serializer_class(instance, context=self.context).data
+        data = {}
+        for name, key, converter in self.get_converters():
+            value = instance[key]
+            data[name] = value if converter is None or value is None else converter(value)
+        return data
+
+
+class BulkCreateListSerializer(serializers.ListSerializer):
+    """
+        Create objects with bulk_create in batches
+        Unique validators and primary key related fields are checked with one query per batch
+        instead of one query per item
+    """
+    batch_size = 1000
+    unique_fields = None
+
+    def to_internal_value(self, data):
+        if self.unique_fields is None:
+            self.unique_fields = self._pop_unique_validators()
+        if isinstance(data, list):
+            self._load_related_objects(data)
+        return self._validate_unique(super().to_internal_value(data))
+
+    def _load_related_objects(self, data):
+        """
+            Load related objects of all items and use them in to_internal_value of related fields
+        """
+        for field in self.child.fields.values():
+            if not isinstance(field, serializers.PrimaryKeyRelatedField) or field.read_only or field.pk_field:
+                continue
+            queryset = field.get_queryset()
+            to_python = queryset.model._meta.pk.to_python
+            pks = set()
+            for item in data:
+                value = item.get(field.field_name) if isinstance(item, dict) else None
+                if value is None or isinstance(value, bool):
+                    continue
+                try:
+                    pks.add(to_python(value))
+                except Exception:
+                    continue
+            pks = list(pks)
+            related_objects = {}
+            for index in range(0, len(pks), self.batch_size):
+                related_objects.update(queryset.in_bulk(pks[index:index + self.batch_size]))
+            field.to_internal_value = self._get_related_to_internal_value(field, related_objects, to_python)
+
+    @staticmethod
+    def _get_related_to_internal_value(field, related_objects, to_python):
+        to_internal_value = type(field).to_internal_value
+
+        def wrapper(data):
+            try:
+                return related_objects[to_python(data)]
+            except Exception:
+                return to_internal_value(field, data)
+
+        return wrapper
+
+    def _pop_unique_validators(self):
+        unique_fields = []
+        for field in self.child.fields.values():
+            validators = [validator for validator in field.validators
+                          if isinstance(validator, UniqueValidator) and validator.lookup == "exact"]
+            if not validators or field.read_only or len(field.source_attrs) != 1:
+                continue
+            field.validators = [validator for validator in field.validators if validator not in validators]
+            unique_fields.append((field, validators))
+        return unique_fields
+
+    def _validate_unique(self, attrs):
+        errors = [{} for _ in attrs]
+        for field, validators in self.unique_fields or ():
+            source = field.source_attrs[0]
+            for validator in validators:
+                values = [item.get(source) for item in attrs]
+                exists = set()
+                for index in range(0, len(values), self.batch_size):
+                    batch_values = [value for value in values[index:index + self.batch_size] if value is not None]
+                    if batch_values:
+                        exists.update(validator.queryset.filter(**{f"{source}__in": batch_values}).values_list(
+                            source, flat=True))
+                seen = set()
+                for index, value in enumerate(values):
+                    if value is None:
+                        continue
+                    if value in exists or value in seen:
+                        errors[index].setdefault(field.field_name, []).append(validator.message)
+                    seen.add(value)
+        if any(errors):
+            raise ValidationError(errors)
+        return attrs
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        info = model_meta.get_field_info(model)
+        many_to_many_names = [name for name, relation in info.relations.items() if relation.to_many]
+        objs = []
+        with transaction.atomic():
+            for index in range(0, len(validated_data), self.batch_size):
+                objs.extend(self._create_batch(model, many_to_many_names,
+                                               validated_data[index:index + self.batch_size]))
+        return objs
+
+    def _create_batch(self, model, many_to_many_names, batch):
+        """
+            Insert one batch, insert_dt and update_dt are filled by pre_save of fields in bulk_create
+        """
+        objs = []
+        many_to_many = []
+        for attrs in batch:
+            attrs = dict(attrs)
+            many_to_many.append({name: attrs.pop(name) for name in many_to_many_names if name in attrs})
+            objs.append(model(**attrs))
+        if hasattr(model, "set_bulk_slug"):
+            model.set_bulk_slug(objs)
+        objs = model._default_manager.bulk_create(objs, batch_size=self.batch_size)
+        for obj, relations in zip(objs, many_to_many):
+            for name, value in relations.items():
+                getattr(obj, name).set(value)
+        return objs
@@ -0,0 +1,68 @@
+/*
+    Load lazy inlines of InlineRelatedAdmin in change form and change their pages without leaving change form
+*/
+'use strict';
+{
+    const $ = django.jQuery;
+
+    function initFormsets(container) {
+        // Same as document ready of admin/js/inlines.js for formsets that are added later
+        $(container).find(".js-inline-admin-formset").each(function() {
+            const data = $(this).data(),
+                inlineOptions = data.inlineFormset;
+            let selector;
+            switch(data.inlineType) {
+            case "stacked":
+                selector = inlineOptions.name + "-group .inline-related";
+                $(selector).stackedFormset(selector, inlineOptions.options);
+                break;
+            case "tabular":
+                selector = inlineOptions.name + "-group .tabular.inline-related tbody:first > tr.form-row";
+                $(selector).tabularFormset(selector, inlineOptions.options);
+                break;
+            }
+        });
+    }
+
+    function loadInlinesScript(container) {
+        if ($.fn.tabularFormset) {
+            initFormsets(container);
+            return;
+        }
+        // inlines.js initializes all formsets of page when it is loaded
+        const script = document.createElement("script");
+        script.src = container.dataset.inlinesJs;
+        document.head.appendChild(script);
+    }
+
+    function loadInline(container, search) {
+        fetch(container.dataset.url + (search || ""), {credentials: "same-origin"})
+            .then(function(response) {
+                if (!response.ok) {
+                    throw new Error(response.statusText);
+                }
+                return response.text();
+            })
+            .then(function(html) {
+                container.innerHTML = html;
+                loadInlinesScript(container);
+            })
+            .catch(function(error) {
+                console.error("can not load inline", error);
+            });
+    }
+
+    document.addEventListener("click", function(event) {
+        const container = event.target.closest(".js-lazy-inline");
+        if (!container) {
+            return;
+        }
+        if (event.target.closest(".js-lazy-inline-load")) {
+            event.preventDefault();
+            loadInline(container);
+        } else if (event.target.closest(".js-inline-page")) {
+            event.preventDefault();
+            loadInline(container, new URL(event.target.closest(".js-inline-page").href).search);
+        }
+    });
+}
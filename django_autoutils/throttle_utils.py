@@ -0,0 +1,167 @@
+"""
+    Throttle clients by ip before any database work
+"""
+import collections
+import functools
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.http import HttpResponse
+from rest_framework.throttling import BaseThrottle
+
+from django_autoutils.utils import get_client_ip
+
+DURATIONS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate: str):
+    """
+        Get (number of requests, duration in seconds) from rate like "100/m"
+    """
+    num, period = rate.split("/")
+    return int(num), DURATIONS[period[0]]
+
+
+class TokenBucket:
+    """
+        Token bucket for each key in process memory
+        Buckets are replaced as tuple without lock, so in race a few extra requests may pass
+        Number of keys is limited with removing least recently used keys
+    """
+
+    def __init__(self, rate: str, max_keys=100000):
+        self.capacity, self.duration = parse_rate(rate)
+        self.fill_rate = self.capacity / self.duration
+        self.max_keys = max_keys
+        # Least recently used key is first
+        self.buckets = collections.OrderedDict()
+
+    def _get(self, key):
+        return self.buckets.get(key)
+
+    def _set(self, key, bucket):
+        """
+            Keys are kept in use order, the least recently used key is removed when table is full
+        """
+        try:
+            self.buckets[key] = bucket
+            self.buckets.move_to_end(key)
+            while len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        except KeyError:
+            # Key is removed by another thread
+            pass
+
+    def consume(self, key) -> float:
+        """
+            Get one token of key
+            Returns:
+                0 if token is available else seconds to wait
+        """
+        now = time.time()
+        bucket = self._get(key)
+        if bucket is None:
+            tokens = self.capacity
+        else:
+            tokens, last_time = bucket
+            tokens = min(self.capacity, tokens + (now - last_time) * self.fill_rate)
+        if tokens >= 1:
+            self._set(key, (tokens - 1, now))
+            return 0
+        self._set(key, (tokens, now))
+        return (1 - tokens) / self.fill_rate
+
+
+class CacheTokenBucket(TokenBucket):
+    """
+        Token bucket in django cache for share buckets between processes
+    """
+
+    def __init__(self, rate: str, cache_alias: str):
+        super().__init__(rate)
+        self.cache = caches[cache_alias]
+
+    def _get(self, key):
+        return self.cache.get(f"autoutils_throttle:{key}")
+
+    def _set(self, key, bucket):
+        self.cache.set(f"autoutils_throttle:{key}", bucket, self.duration)
+
+
+@functools.lru_cache(maxsize=None)
+def get_token_bucket(rate: str, cache_alias: str = None, scope: str = "default") -> "TokenBucket":
+    """
+        Get one token bucket for each rate, cache and scope
+    """
+    if cache_alias is None:
+        return TokenBucket(rate)
+    return CacheTokenBucket(rate, cache_alias)
+
+
+def _get_trusted_proxies():
+    """
+        Get trusted proxies of throttle, without them all clients behind a proxy would share bucket of proxy
+    """
+    trusted_proxies = getattr(settings, "AUTOUTILS_TRUSTED_PROXIES", None)
+    if trusted_proxies is None:
+        raise ImproperlyConfigured("AUTOUTILS_TRUSTED_PROXIES is required with throttle rate, "
+                                   "set it to [] when clients connect without proxy")
+    return tuple(trusted_proxies)
+
+
+class ThrottleMiddleware:
+    """
+        Reject requests of clients that are over limit, add it before other middlewares
+        Settings:
+            AUTOUTILS_THROTTLE_RATE: rate like "100/m", middleware is not used if it is not set
+            AUTOUTILS_THROTTLE_CACHE: alias of cache for share buckets between processes
+            AUTOUTILS_TRUSTED_PROXIES: ip networks of proxies for find client ip in X-Forwarded-For,
+                it is required when rate is set, [] means REMOTE_ADDR is client ip
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        rate = getattr(settings, "AUTOUTILS_THROTTLE_RATE", None)
+        if rate is None:
+            raise MiddlewareNotUsed
+        self.bucket = get_token_bucket(rate, getattr(settings, "AUTOUTILS_THROTTLE_CACHE", None), "middleware")
+        self.trusted_proxies = _get_trusted_proxies()
+
+    def __call__(self, request):
+        wait = self.bucket.consume(get_client_ip(request, self.trusted_proxies))
+        if wait:
+            response = HttpResponse("Too Many Requests", status=429)
+            response["Retry-After"] = str(math.ceil(wait))
+            return response
+        return self.get_response(request)
+
+
+class ClientIpThrottle(BaseThrottle):
+    """
+        DRF throttle with token bucket of client ip
+        Default of `rate` and `cache_alias` are AUTOUTILS_THROTTLE_RATE and AUTOUTILS_THROTTLE_CACHE settings
+        AUTOUTILS_TRUSTED_PROXIES is required like ThrottleMiddleware
+    """
+    rate = None
+    cache_alias = None
+    wait_time = None
+
+    def get_bucket(self):
+        rate = self.rate or getattr(settings, "AUTOUTILS_THROTTLE_RATE", None)
+        if rate is None:
+            return None
+        cache_alias = self.cache_alias or getattr(settings, "AUTOUTILS_THROTTLE_CACHE", None)
+        return get_token_bucket(rate, cache_alias, self.__class__.__name__)
+
+    def allow_request(self, request, view):
+        bucket = self.get_bucket()
+        if bucket is None:
+            return True
+        self.wait_time = bucket.consume(get_client_ip(request, _get_trusted_proxies()))
+        return not self.wait_time
+
+    def wait(self):
+        return self.wait_time
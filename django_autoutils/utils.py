@@ -1,24 +1,54 @@
 """
     Some utils for working with django
 """
+import collections
+import functools
 import inspect
+import ipaddress
 
-from django.contrib.messages.storage.base import BaseStorage
 from django.core.exceptions import ValidationError
 from django.http import HttpRequest
-from rest_framework import exceptions, serializers
+from rest_framework import exceptions
 
+from django_autoutils.message_utils import BufferedMessageStorage
 
-def get_client_ip(request):
+# Least recently used serializer is first
+_model_serializer_cache = collections.OrderedDict()
+MODEL_SERIALIZER_CACHE_SIZE = 256
+
+
+@functools.lru_cache(maxsize=None)
+def parse_networks(networks: tuple) -> tuple:
+    """
+        Parse ip networks once
+    """
+    return tuple(ipaddress.ip_network(network, strict=False) for network in networks)
+
+
+def get_client_ip(request, trusted_proxies=None):
     """
         Get Client IP
+        Without `trusted_proxies` first hop of X-Forwarded-For is used, with it last hop that is not
+        one of trusted proxies is used
     """
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-    if x_forwarded_for:
-        ip = x_forwarded_for.split(',')[0]
-    else:
-        ip = request.META.get('REMOTE_ADDR')
-    return ip
+    if trusted_proxies is None:
+        if x_forwarded_for:
+            ip = x_forwarded_for.split(',')[0]
+        else:
+            ip = request.META.get('REMOTE_ADDR')
+        return ip
+    trusted_proxies = parse_networks(tuple(trusted_proxies))
+    hops = [hop.strip() for hop in x_forwarded_for.split(',')] if x_forwarded_for else []
+    hops.append(request.META.get('REMOTE_ADDR'))
+    for hop in reversed(hops):
+        try:
+            address = ipaddress.ip_address(hop)
+        except ValueError:
+            return hop
+        if not any(address in network for network in trusted_proxies):
+            return hop
+    return hops[0]
 
 
 def get_request_obj():
@@ -31,12 +61,14 @@ def get_request_obj():
     return None
 
 
-def get_empty_request(server_name: str = "localhost", server_port: int = 80):
+def get_empty_request(server_name: str = "localhost", server_port: int = 80, message_level: int = None,
+                      max_messages: int = None):
     """
         Get Empty request
+        Messages are kept in BufferedMessageStorage, use `request._messages.flush()` at end of job
     """
     request = HttpRequest()
-    request._messages = BaseStorage(request=request)
+    request._messages = BufferedMessageStorage(request=request, level=message_level, max_messages=max_messages)
     request.META["SERVER_NAME"] = server_name
     request.META["SERVER_PORT"] = server_port
     request.user = None
@@ -53,11 +85,59 @@ def handle_validation_error(e: "ValidationError", none_field=None):
         raise exceptions.ValidationError({none_field: e.messages})
 
 
-def get_model_serializer(model, fields, read_only_fields=None, base_serializer=serializers.ModelSerializer,
-                         extra_fields: dict = None, meta_extra_fields: dict = None):
+def _get_cache_key(value):
+    """
+        Get hashable key of serializer factory arguments
+        Raise TypeError for objects like field instances that are compared by identity
+    """
+    if isinstance(value, dict):
+        return tuple((key, _get_cache_key(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(_get_cache_key(item) for item in value)
+    if value is None or isinstance(value, (type, str, bytes, int, float)):
+        return value
+    raise TypeError(f"{type(value).__name__} can not be used in cache key")
+
+
+def get_model_serializer(model, fields, read_only_fields=None, base_serializer=None,
+                         extra_fields: dict = None, meta_extra_fields: dict = None, values_mode=False,
+                         bulk_create=False, bulk_batch_size=1000):
     """
         Get Model serializer
+        Classes are memoized on arguments, so DRF builds field mappings once for same arguments
+        Arguments with field instances or other objects are not memoized
+        With `values_mode` get a read only serializer that serialize queryset.values() rows
+        With `bulk_create` serializer with many=True insert objects with bulk_create in `bulk_batch_size` batches
+        Default of `base_serializer` is ModelSerializer
     """
+    if values_mode and bulk_create:
+        raise ValueError("values_mode serializer is read only and can not be used with bulk_create")
+    arguments = (model, fields, read_only_fields, base_serializer, extra_fields, meta_extra_fields, values_mode,
+                 bulk_create, bulk_batch_size)
+    try:
+        key = _get_cache_key(arguments)
+    except TypeError:
+        return _create_model_serializer(*arguments)
+    try:
+        _model_serializer_cache.move_to_end(key)
+        return _model_serializer_cache[key]
+    except KeyError:
+        pass
+    serializer_class = _create_model_serializer(*arguments)
+    _model_serializer_cache[key] = serializer_class
+    while len(_model_serializer_cache) > MODEL_SERIALIZER_CACHE_SIZE:
+        _model_serializer_cache.popitem(last=False)
+    return serializer_class
+
+
+def _create_model_serializer(model, fields, read_only_fields, base_serializer, extra_fields, meta_extra_fields,
+                             values_mode, bulk_create, bulk_batch_size):
+    # Serializers are imported here, so importing utils does not load rest framework serializers
+    from rest_framework import serializers
+    from django_autoutils.serializer_utils import BulkCreateListSerializer, ValuesListSerializer, ValuesSerializer
+
+    if base_serializer is None:
+        base_serializer = serializers.ModelSerializer
     if extra_fields is None:
         extra_fields = {}
     if meta_extra_fields is None:
@@ -70,7 +150,17 @@ def get_model_serializer(model, fields, read_only_fields=None, base_serializer=s
         "read_only_fields": read_only_fields,
         **meta_extra_fields
     })
-    return type('Serializer', (base_serializer,), {
+    if bulk_create:
+        meta_class.list_serializer_class = type('ListSerializer', (BulkCreateListSerializer,), {
+            "batch_size": bulk_batch_size
+        })
+    serializer_class = type('Serializer', (base_serializer,), {
         "Meta": meta_class,
         **extra_fields
     })
+    if not values_mode:
+        return serializer_class
+    return type('Serializer', (ValuesSerializer,), {
+        "Meta": type('Meta', (), {"list_serializer_class": ValuesListSerializer}),
+        "model_serializer_class": serializer_class,
+    })